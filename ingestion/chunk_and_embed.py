@@ -3,21 +3,38 @@ Chunking and Embedding Script for Physics Papers
 Chunks extracted text and generates embeddings for vector database
 """
 
+import argparse
+import contextlib
+import hashlib
+import itertools
 import json
 import os
-import threading
 from pathlib import Path
-from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+import ijson
 from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Let the Rust tokenizer parallelize bulk tokenization across cores (must be set before it is loaded)
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
 # Directory and file paths
 OUTPUT_DIR = 'extracted_data'
-ALL_PAPERS_FILE = "all_papers.json"
-CHUNKS_WITH_EMBEDDINGS_FILE = "chunks_with_embeddings.json"
+ALL_PAPERS_FILE = "all_papers.jsonl"  # One paper per line (written by extract_pdfs.py)
+LEGACY_ALL_PAPERS_FILE = "all_papers.json"  # Single JSON array from older extraction runs
+CHUNKS_FILE = "chunks.parquet"
+EMBEDDINGS_FILE = "embeddings.npy"
+CHUNKS_WITH_EMBEDDINGS_FILE = "chunks_with_embeddings.json"  # Fallback when pyarrow is not installed
 EMBEDDING_SUMMARY_FILE = "embedding_summary.json"
+EMBEDDINGS_CACHE_FILE = "embeddings_cache.npz"
+CACHE_MANIFEST_FILE = "cache_manifest.json"
 
 # Embedding model configuration
 EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
@@ -31,9 +48,133 @@ MIN_CHUNK_LENGTH = 50
 DEFAULT_BATCH_SIZE = 128  # Increased for faster processing (adjust based on available memory)
 MAX_BATCH_SIZE = 512  # Maximum batch size for very large memory systems
 
+# Texts tokenized per bulk tokenizer call (parallel inside the Rust tokenizer, bounded memory)
+TOKENIZE_CHUNK_SIZE = 4096
+
+# GPU input pipeline configuration
+LOADER_PREFETCH_FACTOR = 4  # Tokenized batches each DataLoader worker keeps ready
+
+# Embedding storage configuration
+STORAGE_DTYPE_FLOAT32 = "float32"
+STORAGE_DTYPE_FLOAT16 = "float16"
+STORAGE_DTYPE_INT8 = "int8"
+EMBEDDING_STORAGE_DTYPES = [STORAGE_DTYPE_FLOAT32, STORAGE_DTYPE_FLOAT16, STORAGE_DTYPE_INT8]
+DEFAULT_STORAGE_DTYPE = STORAGE_DTYPE_FLOAT16
+INT8_EMBEDDING_SCALE = 1 / 127  # Embeddings are unit-norm, so one global scale covers every component
+
+# Embedding backends
+BACKEND_TORCH = "torch"
+BACKEND_TORCH_INT8 = "torch-int8"
+BACKEND_ONNX_INT8 = "onnx-int8"
+EMBEDDING_BACKENDS = [BACKEND_TORCH, BACKEND_TORCH_INT8, BACKEND_ONNX_INT8]
+TORCH_BACKENDS = [BACKEND_TORCH, BACKEND_TORCH_INT8]
+
+# bitsandbytes LLM.int8 configuration (used by the torch-int8 backend)
+INT8_OUTLIER_THRESHOLD = 6.0  # Activations above this stay in FP16 (mixed-precision decomposition)
+
+# ONNX Runtime configuration (used by the onnx-int8 backend)
+ONNX_MODEL_DIR = "onnx_models"
+ONNX_QUANTIZED_FILE = "model_quantized.onnx"
+ONNX_MAX_SEQ_LENGTH = 256  # Same truncation length as the sentence-transformers model
+ONNX_SEQ_LENGTH_BUCKETS = [64, 128, 256]  # One shape-specialized session per padded sequence length
+ONNX_SEQ_LENGTH_DIM = "sequence_length"  # Name of the dynamic axis in the exported graph
+
 # Parallelization configuration
 DEFAULT_CPU_COUNT = 4
-WORKER_MULTIPLIER = 2
+PAPERS_PER_TASK = 4  # Papers sent to a worker process per task, amortizes pickling
+PENDING_TASKS_PER_WORKER = 2  # Bounds how many parsed papers wait in the executor queue
+SERIAL_PAPERS_PER_WORKER = 2  # Below workers * this many papers, chunk serially (process startup dominates)
+
+# Separator used to rebuild a paper's full text from its pages (matches extract_pdfs.py)
+PAGE_SEPARATOR = "\n\n"
+
+# Fields a worker needs to chunk one paper: (arxiv_id, full_text, filename, num_pages, title)
+PaperFields = Tuple[str, Optional[str], str, int, str]
+
+# all_papers.jsonl columns (after flattening nested structs) that map to PaperFields
+PAPER_FIELD_COLUMNS = ["arxiv_id", "full_text", "filename", "num_pages", "metadata.title"]
+
+# Per-paper metadata shared by all of its chunks: (arxiv_id, filename, num_pages, title)
+PaperMetadata = Tuple[str, str, int, str]
+
+# Chunks are kept column-wise (one list/array per field, one entry per chunk)
+# so per-chunk metadata dicts are never built
+METADATA_COLUMNS = ["arxiv_id", "filename", "num_pages", "title"]
+CHUNK_COLUMNS = ["text", *METADATA_COLUMNS, "chunk_index", "start_word", "end_word"]
+POSITION_COLUMNS = ["chunk_index", "start_word", "end_word"]
+
+
+def paper_full_text(paper_data: Dict) -> Optional[str]:
+    """
+    Full text of an extracted paper, joined from its pages
+    (papers from older extraction runs carry a precomputed 'full_text')
+    """
+    if "full_text" in paper_data:
+        return paper_data["full_text"]
+    pages = paper_data.get("pages")
+    if pages is None:
+        return None
+    return PAGE_SEPARATOR.join(page["text"] for page in pages)
+
+
+def _batched(iterable: Iterable, size: int) -> Iterator[List]:
+    """Yield lists of up to `size` items from an iterable"""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _chunk_papers_task(chunk_size: int, chunk_overlap: int, papers: List[PaperFields]) -> List[Tuple]:
+    """
+    Worker-process entry point (module-level so it can be pickled)
+    """
+    chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap, max_workers=1)
+    return chunker.chunk_papers(papers)
+
+
+def new_chunk_columns() -> Dict[str, List]:
+    return {name: [] for name in CHUNK_COLUMNS}
+
+
+def append_paper_chunks(
+    columns: Dict[str, List],
+    metadata: PaperMetadata,
+    texts: List[str],
+    start_words: np.ndarray,
+    end_words: np.ndarray
+):
+    """
+    Append one paper's chunks to a column table built by new_chunk_columns()
+    Position columns collect one array per paper until finalize_chunk_columns()
+    """
+    count = len(texts)
+    columns["text"].extend(texts)
+    for name, value in zip(METADATA_COLUMNS, metadata):
+        columns[name].extend(itertools.repeat(value, count))
+    columns["chunk_index"].append(np.arange(count, dtype=np.int64))
+    columns["start_word"].append(start_words)
+    columns["end_word"].append(end_words)
+
+
+def finalize_chunk_columns(columns: Dict[str, List]) -> Dict:
+    """
+    Concatenate the per-paper position arrays into one array per column
+    """
+    for name in POSITION_COLUMNS:
+        columns[name] = np.concatenate(columns[name]) if columns[name] else np.empty(0, dtype=np.int64)
+    return columns
+
+
+def iter_chunk_records(chunks: Dict) -> Iterator[Dict]:
+    """
+    Materialize {"text", "metadata"} dicts from the column table, one chunk at a time
+    Only needed for row-oriented output such as the JSON fallback
+    """
+    columns = [chunks[name].tolist() if name in POSITION_COLUMNS else chunks[name] for name in CHUNK_COLUMNS]
+    metadata_names = CHUNK_COLUMNS[1:]
+    for text, *metadata in zip(*columns):
+        yield {"text": text, "metadata": dict(zip(metadata_names, metadata))}
+
 
 class TextChunker:
     def __init__(
@@ -46,107 +187,495 @@ class TextChunker:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.extracted_data_dir = Path(extracted_data_dir)
-        # Thread-safe lock for progress updates
-        self.print_lock = threading.Lock()
-        # Determine number of workers
+        # Determine number of worker processes (chunking is CPU-bound, one per core)
         if max_workers is None:
-            self.max_workers = min((os.cpu_count() or DEFAULT_CPU_COUNT) * WORKER_MULTIPLIER, 32)
+            self.max_workers = os.cpu_count() or DEFAULT_CPU_COUNT
         else:
             self.max_workers = max_workers
         
-    def chunk_text(self, text: str, metadata: Dict) -> List[Dict]:
+    def chunk_text(self, text: str) -> Tuple[List[str], np.ndarray, np.ndarray]:
         """
-        Split text into overlapping chunks with metadata
+        Split text into overlapping chunks
+        Word windows are mapped to character offsets of a single joined string,
+        so each chunk is one slice instead of a per-window join
+        
+        Returns: (texts, start_words, end_words)
         """
         words = text.split()
-        chunks = []
+        if not words:
+            return [], np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        
+        joined = " ".join(words)
+        num_words = len(words)
+        step = self.chunk_size - self.chunk_overlap
+        
+        # Character offset where each word starts / ends in the joined string
+        # (word lengths measured once, with the separating space folded into the cumsum)
+        word_lengths = np.fromiter(map(len, words), dtype=np.int64, count=num_words)
+        word_ends = np.cumsum(word_lengths + 1) - 1
+        word_starts = word_ends - word_lengths
+        
+        # Word windows and their character spans
+        start_words = np.arange(0, num_words, step)
+        end_words = np.minimum(start_words + self.chunk_size, num_words)
+        char_starts = word_starts[start_words]
+        char_ends = word_ends[end_words - 1]
+        
+        # Skip very small chunks (length comes from the offsets, no per-chunk strip/scan)
+        keep = (char_ends - char_starts) > MIN_CHUNK_LENGTH
+        
+        texts = [
+            joined[char_start:char_end]
+            for char_start, char_end in zip(char_starts[keep].tolist(), char_ends[keep].tolist())
+        ]
+        
+        return texts, start_words[keep], end_words[keep]
+    
+    @staticmethod
+    def make_paper_fields(arxiv_id, full_text, filename, num_pages, title) -> PaperFields:
+        """
+        Build PaperFields with the same defaults whichever reader parsed the paper:
+        a missing or empty ID becomes "unknown", a missing or empty title "Unknown"
+        """
+        return (arxiv_id or "unknown", full_text, filename, num_pages, title or "Unknown")
+    
+    @staticmethod
+    def paper_fields(paper_data: Dict) -> PaperFields:
+        """
+        Pick out only the fields needed for chunking, so workers receive one joined text, not per-page dicts
+        """
+        return TextChunker.make_paper_fields(
+            paper_data.get("arxiv_id"),
+            paper_full_text(paper_data),
+            paper_data.get("filename"),
+            paper_data.get("num_pages"),
+            (paper_data.get("metadata") or {}).get("title")
+        )
+    
+    def iter_papers(self) -> Iterator[PaperFields]:
+        """
+        Yield the chunking fields of every paper in the extracted data directory
+        all_papers.jsonl is parsed by pyarrow's JSON reader straight into Arrow columns
+        (no per-paper dicts), or line by line without pyarrow;
+        a legacy all_papers.json array is streamed with ijson
+        """
+        jsonl_file = self.extracted_data_dir / ALL_PAPERS_FILE
+        if jsonl_file.exists():
+            try:
+                import pyarrow as pa
+                import pyarrow.compute as pc
+                import pyarrow.json as pa_json
+            except ImportError:
+                pa_json = None
+            
+            if pa_json is not None:
+                print(f"Reading papers from {jsonl_file} (pyarrow)...")
+                # Only the needed fields are parsed into columns; page numbers and other metadata are skipped
+                parse_options = pa_json.ParseOptions(
+                    explicit_schema=pa.schema([
+                        ("arxiv_id", pa.string()),
+                        ("full_text", pa.string()),  # Only present in older extraction output
+                        ("pages", pa.list_(pa.struct([("text", pa.string())]))),
+                        ("filename", pa.string()),
+                        ("num_pages", pa.int64()),
+                        ("metadata", pa.struct([("title", pa.string())]))
+                    ]),
+                    unexpected_field_behavior="ignore"
+                )
+                table = pa_json.read_json(jsonl_file, parse_options=parse_options).flatten()
+                num_rows = table.num_rows
+                
+                # Convert one record batch at a time so only a batch of texts exists as Python strings
+                for batch in table.to_batches():
+                    # Join page texts in Arrow, one list join per batch
+                    pages = batch.column("pages")
+                    page_texts = pa.ListArray.from_arrays(pages.offsets, pages.values.field("text"), mask=pages.is_null())
+                    full_texts = pc.coalesce(batch.column("full_text"), pc.binary_join(page_texts, PAGE_SEPARATOR))
+                    
+                    columns = [
+                        full_texts.to_pylist() if name == "full_text" else batch.column(name).to_pylist()
+                        for name in PAPER_FIELD_COLUMNS
+                    ]
+                    for fields in zip(*columns):
+                        yield self.make_paper_fields(*fields)
+                print(f"✓ Read {num_rows} papers")
+                return
+            
+            print("⚠ pyarrow not found, reading JSONL line by line")
+            print(f"Streaming papers from {jsonl_file}...")
+            loads = orjson.loads if orjson is not None else json.loads
+            with open(jsonl_file, 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        yield self.paper_fields(loads(line))
+            return
         
-        for i in range(0, len(words), self.chunk_size - self.chunk_overlap):
-            chunk_words = words[i:i + self.chunk_size]
-            chunk_text = " ".join(chunk_words)
+        all_papers_file = self.extracted_data_dir / LEGACY_ALL_PAPERS_FILE
+        print(f"Streaming papers from {all_papers_file}...")
+        with open(all_papers_file, 'rb') as f:
+            for paper in ijson.items(f, 'item', use_float=True):
+                yield self.paper_fields(paper)
+    
+    def chunk_papers(self, papers: List[PaperFields]) -> List[Tuple]:
+        """
+        Chunk several papers
+        Returns one (metadata, (texts, start_words, end_words), error_message) tuple per paper
+        """
+        results = []
+        for arxiv_id, full_text, filename, num_pages, title in papers:
+            metadata = (arxiv_id, filename, num_pages, title)
+            if full_text is None:
+                results.append((metadata, None, "missing 'full_text'"))
+                continue
+            try:
+                results.append((metadata, self.chunk_text(full_text), None))
+            except Exception as e:
+                results.append((metadata, None, str(e)))
+        return results
+    
+    def process_paper(self, paper_data: Dict) -> Dict:
+        """
+        Process a single paper and create its chunk columns
+        """
+        columns = new_chunk_columns()
+        (metadata, chunked, error), = self.chunk_papers([self.paper_fields(paper_data)])
+        if error is not None:
+            raise ValueError(error)
+        append_paper_chunks(columns, metadata, *chunked)
+        return finalize_chunk_columns(columns)
+    
+    def process_all_papers(self) -> Dict:
+        """
+        Process all papers and return all chunks as columns (see CHUNK_COLUMNS)
+        Papers are read with iter_papers() and at most a few tasks per worker are in flight,
+        so only a handful of full texts are held as Python strings at once
+        Chunking is CPU-bound, so it runs in worker processes (or serially for small corpora)
+        """
+        all_chunks = new_chunk_columns()
+        completed_count = 0
+        max_in_flight = PENDING_TASKS_PER_WORKER * self.max_workers
+        serial_threshold = SERIAL_PAPERS_PER_WORKER * self.max_workers
+        
+        paper_stream = self.iter_papers()
+        
+        with tqdm(desc="Chunking papers", unit="paper") as pbar:
             
-            if len(chunk_text.strip()) > MIN_CHUNK_LENGTH:  # Skip very small chunks
-                chunks.append({
-                    "text": chunk_text,
-                    "metadata": {
-                        **metadata,
-                        "chunk_index": len(chunks),
-                        "start_word": i,
-                        "end_word": i + len(chunk_words)
-                    }
-                })
-        
-        return chunks
-    
-    def process_paper(self, paper_data: Dict) -> List[Dict]:
-        """
-        Process a single paper and create chunks with metadata
-        """
-        arxiv_id = paper_data["arxiv_id"]
-        full_text = paper_data["full_text"]
-        
-        base_metadata = {
-            "arxiv_id": arxiv_id,
-            "filename": paper_data["filename"],
-            "num_pages": paper_data["num_pages"],
-            "title": paper_data.get("metadata", {}).get("title", "Unknown")
-        }
+            def collect(results):
+                nonlocal completed_count
+                for metadata, chunked, error in results:
+                    if error is None:
+                        append_paper_chunks(all_chunks, metadata, *chunked)
+                        completed_count += 1
+                        pbar.set_postfix_str(f"{completed_count} papers, {len(all_chunks['text'])} chunks")
+                    else:
+                        print(f"  ✗ Error processing paper {metadata[0]}: {error}")
+                    pbar.update(1)
+            
+            head = list(itertools.islice(paper_stream, serial_threshold))
+            
+            if len(head) < serial_threshold:
+                # Small corpus: spawning worker processes costs more than it saves
+                print("Small corpus, chunking serially")
+                collect(self.chunk_papers(head))
+            else:
+                print(f"Using {self.max_workers} worker processes")
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    # Submit chunking tasks as papers are parsed, keeping the queue bounded
+                    pending = set()
+                    for batch in _batched(itertools.chain(head, paper_stream), PAPERS_PER_TASK):
+                        if len(pending) >= max_in_flight:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                collect(future.result())
+                        pending.add(executor.submit(_chunk_papers_task, self.chunk_size, self.chunk_overlap, batch))
+                    
+                    # Process remaining chunking as it finishes
+                    for future in as_completed(pending):
+                        collect(future.result())
+        
+        print(f"\nCreated {len(all_chunks['text'])} chunks from {completed_count} papers")
+        return finalize_chunk_columns(all_chunks)
+
+
+class _TokenizingCollate:
+    def __init__(self, tokenizer, texts: List[str], max_seq_length: int):
+        """
+        DataLoader collate_fn that tokenizes one batch of row indices into padded tensors
+        A module-level class (not a closure) so DataLoader worker processes can pickle it
+        """
+        self.tokenizer = tokenizer
+        self.texts = texts
+        self.max_seq_length = max_seq_length
+    
+    def __call__(self, batch_rows: np.ndarray):
+        encoded = self.tokenizer(
+            [self.texts[i] for i in batch_rows],
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="pt"
+        )
+        return batch_rows, dict(encoded)
+
+
+class ChunkCache:
+    def __init__(self, cache_dir: str = "", model_name: str = EMBEDDING_MODEL_NAME, numeric_path: str = ""):
+        """
+        Content-addressed cache of chunk embeddings from previous runs
+        Keys are a hash of the chunk text, so any paper whose text and chunking
+        parameters are unchanged produces only cache hits and is not re-embedded
         
-        # Create chunks for the full paper
-        chunks = self.chunk_text(full_text, base_metadata)
+        Args:
+            cache_dir: Directory holding the cache files
+            model_name: Embedding model; a cache written by a different model is ignored
+            numeric_path: EmbeddingGenerator.numeric_path; a cache written by another backend/precision is ignored
+        """
+        self.cache_dir = Path(cache_dir)
+        self.embeddings_path = self.cache_dir / EMBEDDINGS_CACHE_FILE
+        self.manifest_path = self.cache_dir / CACHE_MANIFEST_FILE
+        self.model_name = model_name
+        self.numeric_path = numeric_path
+        self._rows = {}
+        self._embeddings = None
+        self._load()
+    
+    def _load(self):
+        if not (self.manifest_path.exists() and self.embeddings_path.exists()):
+            return
         
-        return chunks
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("model_name") != self.model_name:
+                print(f"⚠ Embedding cache was built with {manifest.get('model_name')}, ignoring it")
+                return
+            if manifest.get("numeric_path") != self.numeric_path:
+                print(f"⚠ Embedding cache was built with the {manifest.get('numeric_path')} backend "
+                      f"(now {self.numeric_path}), ignoring it")
+                return
+            
+            with np.load(self.embeddings_path, allow_pickle=False) as data:
+                keys = data["keys"]
+                self._embeddings = data["embeddings"]
+            self._rows = {key: row for row, key in enumerate(keys.tolist())}
+            print(f"✓ Loaded {len(self._rows)} cached embeddings from {self.embeddings_path}")
+        except Exception as e:
+            print(f"⚠ Could not read embedding cache, starting fresh: {str(e)}")
+            self._rows = {}
+            self._embeddings = None
+    
+    @staticmethod
+    def text_key(text: str) -> str:
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def lookup(self, keys: List[str]) -> np.ndarray:
+        """
+        Returns: rows where rows[i] is the cache row for keys[i] (see text_key), or -1 on a miss
+        """
+        return np.fromiter((self._rows.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+    
+    def get(self, rows: np.ndarray) -> np.ndarray:
+        return self._embeddings[rows]
     
-    def process_all_papers(self) -> List[Dict]:
+    def save(self, keys: List[str], embeddings: np.ndarray):
         """
-        Process all papers and return all chunks using parallel processing
+        Merge this run's embeddings into the cache
+        Entries from earlier runs are kept, so an empty, truncated or failed run cannot wipe the cache
         """
-        all_papers_file = self.extracted_data_dir / ALL_PAPERS_FILE
+        if not keys:
+            print("⚠ No embeddings to cache, keeping the existing embedding cache")
+            return
         
-        with open(all_papers_file, 'r', encoding='utf-8') as f:
-            papers = json.load(f)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        new_keys = set(keys)
+        kept_keys = [key for key in self._rows if key not in new_keys]
+        if kept_keys:
+            kept_rows = np.fromiter((self._rows[key] for key in kept_keys), dtype=np.int64, count=len(kept_keys))
+            keys = kept_keys + list(keys)
+            embeddings = np.concatenate([self._embeddings[kept_rows], embeddings])
         
-        print(f"Processing {len(papers)} papers...")
-        print(f"Using {self.max_workers} parallel workers")
-        print()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        np.savez(self.embeddings_path, keys=np.array(keys), embeddings=embeddings)
         
-        all_chunks = []
-        completed_count = 0
-        total_count = len(papers)
-        
-        # Process papers in parallel
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all chunking tasks
-            future_to_paper = {
-                executor.submit(self.process_paper, paper): paper
-                for paper in papers
-            }
+        manifest = {
+            "model_name": self.model_name,
+            "numeric_path": self.numeric_path,
+            "entries": len(keys),
+            "key": "blake2b-128 of chunk text"
+        }
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._embeddings = embeddings
+        print(f"✓ Embedding cache saved to {self.embeddings_path} ({len(keys)} entries)")
+
+
+class OnnxEmbeddingModel:
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, model_dir: str = ONNX_MODEL_DIR):
+        """
+        Dynamically INT8-quantized ONNX export of a sentence transformer model
+        Exposes the subset of the SentenceTransformer API used by EmbeddingGenerator
+        
+        Args:
+            model_name: Name of the sentence transformer model to export
+            model_dir: Directory where the exported/quantized model is cached
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        
+        export_dir = Path(model_dir) / model_name.replace("/", "__")
+        quantized_dir = export_dir / "int8"
+        quantized_file = quantized_dir / ONNX_QUANTIZED_FILE
+        
+        # Export and quantize once, reuse the cached model on later runs
+        if not quantized_file.exists():
+            from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
             
-            # Process completed chunking as they finish
-            with tqdm(total=total_count, desc="Chunking papers") as pbar:
-                for future in as_completed(future_to_paper):
-                    paper = future_to_paper[future]
-                    try:
-                        chunks = future.result()
-                        all_chunks.extend(chunks)
-                        
-                        with self.print_lock:
-                            completed_count += 1
-                            pbar.set_postfix_str(f"{completed_count}/{total_count} papers, {len(all_chunks)} chunks")
-                        
-                        pbar.update(1)
-                        
-                    except Exception as e:
-                        with self.print_lock:
-                            print(f"  ✗ Error processing paper {paper.get('arxiv_id', 'unknown')}: {str(e)}")
-                        pbar.update(1)
-        
-        print(f"\nCreated {len(all_chunks)} chunks from {len(papers)} papers")
-        return all_chunks
+            print("Exporting model to ONNX and quantizing to INT8 (one-time step)...")
+            ort_model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+            ort_model.save_pretrained(export_dir)
+            quantizer = ORTQuantizer.from_pretrained(ort_model)
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=quantized_dir, quantization_config=qconfig)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        
+        # Prefer OpenVINO when it is installed, otherwise the default CPU provider
+        self._ort = ort
+        self._model_path = str(quantized_file)
+        self._providers = ["CPUExecutionProvider"]
+        if "OpenVINOExecutionProvider" in ort.get_available_providers():
+            self._providers.insert(0, "OpenVINOExecutionProvider")
+        
+        # Generic dynamic-shape session, plus specialized sessions created on first use per bucket
+        self.session = self._create_session()
+        self._bucket_sessions = {}
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        self.embedding_dim = self.session.get_outputs()[0].shape[-1]
+        self.max_seq_length = ONNX_MAX_SEQ_LENGTH
+        self.pad_token_id = self.tokenizer.pad_token_id or 0
+    
+    def _create_session(self, seq_length: int = None):
+        """
+        Create an inference session, optionally with the sequence axis fixed to seq_length
+        so shape inference and kernel selection can specialize for it
+        """
+        session_options = self._ort.SessionOptions()
+        session_options.graph_optimization_level = self._ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if seq_length is not None:
+            session_options.add_free_dimension_override_by_name(ONNX_SEQ_LENGTH_DIM, seq_length)
+        return self._ort.InferenceSession(self._model_path, sess_options=session_options, providers=self._providers)
+    
+    def _session_for(self, seq_length: int):
+        """
+        Returns: (session, padded_length) for the smallest bucket that fits seq_length
+        """
+        for bucket in ONNX_SEQ_LENGTH_BUCKETS:
+            if seq_length <= bucket:
+                if bucket not in self._bucket_sessions:
+                    self._bucket_sessions[bucket] = self._create_session(bucket)
+                return self._bucket_sessions[bucket], bucket
+        return self.session, seq_length
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.embedding_dim
+    
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        show_progress_bar: bool = False,
+        normalize_embeddings: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Encode texts into embeddings (mean pooling + optional L2 normalization)
+        Each batch is only padded to its own longest text
+        """
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        
+        for start in tqdm(range(0, len(texts), batch_size), desc="Batches", disable=not show_progress_bar):
+            batch = texts[start:start + batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            embeddings[start:start + len(batch)] = self.embed_tokens(
+                encoded["input_ids"],
+                encoded["attention_mask"],
+                normalize_embeddings=normalize_embeddings
+            )
+        
+        return embeddings
+    
+    def embed_tokens(self, input_ids: np.ndarray, attention_mask: np.ndarray, normalize_embeddings: bool = True) -> np.ndarray:
+        """
+        Run the model on an already tokenized and padded batch
+        The batch is padded up to its sequence-length bucket and run on that bucket's session
+        """
+        session, padded_length = self._session_for(input_ids.shape[1])
+        pad = padded_length - input_ids.shape[1]
+        if pad:
+            input_ids = np.pad(input_ids, ((0, 0), (0, pad)), constant_values=self.pad_token_id)
+            attention_mask = np.pad(attention_mask, ((0, 0), (0, pad)), constant_values=0)
+        
+        inputs = {
+            "input_ids": input_ids.astype(np.int64),
+            "attention_mask": attention_mask.astype(np.int64),
+            "token_type_ids": np.zeros_like(input_ids, dtype=np.int64)
+        }
+        token_embeddings = session.run(None, {name: inputs[name] for name in self.input_names})[0]
+        
+        # Mean pooling over non-padding tokens
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        
+        if normalize_embeddings:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        
+        return pooled
+
+
+def _replace_linear_with_int8(module, bitsandbytes) -> int:
+    """
+    Recursively swap torch.nn.Linear layers for bitsandbytes Linear8bitLt (LLM.int8, inference only)
+    Weights are quantized to int8 when the new layer is moved to the GPU
+    
+    Returns: number of layers replaced
+    """
+    import torch
+    
+    count = 0
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.Linear):
+            int8_layer = bitsandbytes.nn.Linear8bitLt(
+                child.in_features,
+                child.out_features,
+                bias=child.bias is not None,
+                has_fp16_weights=False,
+                threshold=INT8_OUTLIER_THRESHOLD
+            )
+            int8_layer.weight = bitsandbytes.nn.Int8Params(
+                child.weight.data.cpu(),
+                requires_grad=False,
+                has_fp16_weights=False
+            )
+            if child.bias is not None:
+                int8_layer.bias = child.bias
+            setattr(module, name, int8_layer.to(child.weight.device))
+            count += 1
+        else:
+            count += _replace_linear_with_int8(child, bitsandbytes)
+    return count
 
 
 class EmbeddingGenerator:
-    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, device: str = None):
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, device: str = None, backend: str = BACKEND_TORCH):
         """
         Initialize embedding model
         all-MiniLM-L6-v2: Fast, 384 dimensions, good for semantic search
@@ -154,9 +683,18 @@ class EmbeddingGenerator:
         Args:
             model_name: Name of the sentence transformer model
             device: Device to use ('cuda', 'cpu', or None for auto-detection)
+            backend: 'torch' (sentence-transformers), 'torch-int8' (int8 Linear layers via bitsandbytes, CUDA only)
+                     or 'onnx-int8' (quantized ONNX Runtime, CPU only)
         """
         print(f"Loading embedding model: {model_name}")
         
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}'. Choose from: {', '.join(EMBEDDING_BACKENDS)}")
+        
+        # The quantized ONNX model targets CPU int8 instructions
+        if backend == BACKEND_ONNX_INT8:
+            device = 'cpu'
+        
         # Auto-detect device if not specified
         if device is None:
             try:
@@ -175,12 +713,26 @@ class EmbeddingGenerator:
                 device = 'cpu'
                 print("⚠ PyTorch not found, using CPU")
         
+        # bitsandbytes int8 kernels are CUDA-only
+        if backend == BACKEND_TORCH_INT8 and device != 'cuda':
+            print(f"⚠ {BACKEND_TORCH_INT8} backend needs a CUDA GPU, falling back to {BACKEND_TORCH}")
+            backend = BACKEND_TORCH
+        
         self.device = device
-        self.model = SentenceTransformer(model_name, device=device)
+        self.backend = backend
+        self.model_name = model_name
+        # Numeric path the embeddings come out of (updated by _optimize_for_gpu); see numeric_path
+        self.precision = "int8" if backend == BACKEND_ONNX_INT8 else "fp32"
+        if backend == BACKEND_ONNX_INT8:
+            self.model = OnnxEmbeddingModel(model_name)
+        else:
+            self.model = SentenceTransformer(model_name, device=device)
+        self.tokenizer = self.model.tokenizer
+        self.max_seq_length = self.model.max_seq_length
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         
         print(f"Model loaded! Embedding dimension: {self.embedding_dim}")
-        print(f"Using device: {device.upper()}")
+        print(f"Using device: {device.upper()} ({backend} backend)")
         
         if device == 'cuda':
             try:
@@ -189,16 +741,83 @@ class EmbeddingGenerator:
                 print(f"GPU Memory: {torch.cuda.get_device_properties(0).total_memory / 1024**3:.2f} GB")
             except (ImportError, AttributeError):
                 pass
+            
+            if backend in TORCH_BACKENDS:
+                self._optimize_for_gpu()
     
-    def generate_embeddings(self, chunks: List[Dict], batch_size: int = None) -> List[Dict]:
+    def _optimize_for_gpu(self):
+        """
+        Run the encoder in FP16 and compile the transformer with torch.compile
+        With the torch-int8 backend, Linear layers are additionally swapped for int8 ones (not compiled)
+        Inference only, so the precision drop is safe; embeddings are cast back to FP32 for storage
+        """
+        import torch
+        
+        self.model = self.model.half()
+        self.precision = "fp16"
+        print("✓ Using FP16 weights on GPU")
+        
+        if self.backend == BACKEND_TORCH_INT8:
+            try:
+                import bitsandbytes
+                
+                count = _replace_linear_with_int8(self.model[0].auto_model, bitsandbytes)
+                self.precision = "int8"
+                print(f"✓ Quantized {count} Linear layers to int8 (bitsandbytes)")
+                return
+            except ImportError:
+                print("⚠ bitsandbytes not found, falling back to FP16")
+                self.backend = BACKEND_TORCH
+        
+        if hasattr(torch, "compile"):
+            try:
+                transformer = self.model[0]
+                # dynamic=True avoids a recompile for every padded sequence length
+                transformer.auto_model = torch.compile(transformer.auto_model, dynamic=True)
+                self.precision = "fp16-compiled"
+                print("✓ Transformer compiled with torch.compile")
+            except Exception as e:
+                print(f"⚠ torch.compile unavailable, running eagerly: {str(e)}")
+    
+    @property
+    def numeric_path(self) -> str:
+        """
+        Backend and precision the embeddings are computed with, e.g. "torch/fp16-compiled" or "onnx-int8/int8"
+        Embeddings from different paths differ slightly, so caches are keyed on it
+        """
+        return f"{self.backend}/{self.precision}"
+    
+    def _inference_context(self):
+        """
+        No-grad FP16 autocast on GPU, a no-op context elsewhere
+        """
+        if self.device != 'cuda' or self.backend not in TORCH_BACKENDS:
+            return contextlib.nullcontext()
+        
+        import torch
+        
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        stack.enter_context(torch.autocast("cuda", dtype=torch.float16))
+        return stack
+    
+    def generate_embeddings(
+        self,
+        chunks: Dict,
+        batch_size: int = None,
+        cache: ChunkCache = None
+    ) -> Tuple[Dict, np.ndarray]:
         """
         Generate embeddings for all chunks with optimized batch processing
         
         Args:
-            chunks: List of chunk dictionaries with 'text' field
+            chunks: Chunk columns with a 'text' column (see TextChunker.process_all_papers)
             batch_size: Batch size for processing (auto-adjusted if None)
+            cache: Optional ChunkCache; only chunks missing from it are embedded, and it is updated afterwards
+        
+        Returns: (chunks, embeddings) where row i of embeddings belongs to chunk i
         """
-        texts = [chunk["text"] for chunk in chunks]
+        texts = chunks["text"]
         
         # Auto-adjust batch size based on device and data size
         if batch_size is None:
@@ -213,57 +832,299 @@ class EmbeddingGenerator:
                 else:
                     batch_size = DEFAULT_BATCH_SIZE
         
-        print(f"Generating embeddings for {len(texts)} chunks...")
-        print(f"Batch size: {batch_size}")
+        # Identical chunk texts (shared boilerplate, headers, references) are embedded once
+        keys = [ChunkCache.text_key(text) for text in texts]
+        _, first_rows, inverse = np.unique(np.array(keys), return_index=True, return_inverse=True)
+        unique_keys = [keys[i] for i in first_rows]
+        unique_texts = [texts[i] for i in first_rows]
+        if len(unique_texts) < len(texts):
+            print(f"Skipping {len(texts) - len(unique_texts)} duplicate chunks")
         
-        # Generate embeddings with optimized settings
-        embeddings = self.model.encode(
-            texts,
-            batch_size=batch_size,
-            show_progress_bar=True,
-            convert_to_numpy=True,
-            normalize_embeddings=False  # Slightly faster, normalize only if needed
+        if cache is None:
+            print(f"Generating embeddings for {len(unique_texts)} chunks...")
+            print(f"Batch size: {batch_size}")
+            unique_embeddings = self._encode(unique_texts, batch_size)
+        else:
+            rows = cache.lookup(unique_keys)
+            missing = np.flatnonzero(rows < 0)
+            cached = np.flatnonzero(rows >= 0)
+            
+            print(f"Embedding cache: {len(cached)} hits, {len(missing)} chunks to embed")
+            unique_embeddings = np.empty((len(unique_texts), self.embedding_dim), dtype=np.float32)
+            if len(cached):
+                unique_embeddings[cached] = cache.get(rows[cached])
+            if len(missing):
+                print(f"Generating embeddings for {len(missing)} chunks...")
+                print(f"Batch size: {batch_size}")
+                unique_embeddings[missing] = self._encode([unique_texts[i] for i in missing], batch_size)
+            
+            cache.save(unique_keys, unique_embeddings)
+        
+        return chunks, unique_embeddings[inverse.reshape(-1)]
+    
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """
+        Encode texts in length-sorted order and return float32 embeddings in input order
+        """
+        if self.device == 'cuda' and self.backend in TORCH_BACKENDS:
+            # Sort texts by length so each batch only pads to similar-length neighbours
+            lengths = np.fromiter((len(text.split()) for text in texts), dtype=np.int64, count=len(texts))
+            order = np.argsort(lengths, kind="stable")
+            return self._encode_pipelined(texts, order, batch_size)
+        
+        # Bulk-tokenize up front (parallel in the fast tokenizer), then run only the forward pass per batch
+        return self._embed_tokenized(*self._tokenize(texts), batch_size)
+    
+    def _encode_pipelined(self, texts: List[str], order: np.ndarray, batch_size: int) -> np.ndarray:
+        """
+        GPU encode loop that overlaps CPU work with GPU compute:
+        DataLoader workers tokenize upcoming batches into pinned memory, batches are
+        copied to the GPU asynchronously, and a separate thread copies results back
+        into a preallocated array while the next batch runs
+        """
+        import torch
+        from torch.utils.data import DataLoader
+        
+        batches = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+        num_workers = (os.cpu_count() or DEFAULT_CPU_COUNT) // 2
+        loader_options = {"prefetch_factor": LOADER_PREFETCH_FACTOR} if num_workers else {}
+        loader = DataLoader(
+            batches,
+            batch_size=None,  # Items are already batches of row indices
+            collate_fn=_TokenizingCollate(self.tokenizer, texts, self.max_seq_length),
+            num_workers=num_workers,
+            pin_memory=True,
+            **loader_options
         )
         
-        # Efficiently add embeddings to chunks (vectorized conversion)
-        print("Adding embeddings to chunks...")
-        embeddings_list = embeddings.tolist()
-        for i, chunk in enumerate(chunks):
-            chunk["embedding"] = embeddings_list[i]
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        
+        def store(batch_rows, output):
+            embeddings[batch_rows] = output.float().cpu().numpy()
+        
+        with ThreadPoolExecutor(max_workers=1) as copier, self._inference_context():
+            copies = []
+            for batch_rows, features in tqdm(loader, desc="Batches"):
+                features = {name: tensor.to(self.device, non_blocking=True) for name, tensor in features.items()}
+                output = self.model(features)["sentence_embedding"]
+                output = torch.nn.functional.normalize(output, p=2, dim=1)
+                copies.append(copier.submit(store, batch_rows, output))
+            
+            for copy in copies:
+                copy.result()
         
-        return chunks
+        return embeddings
+    
+    def _tokenize(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tokenize texts without padding using the fast (Rust) tokenizer on large slices,
+        so tokenization is batched and parallelized across cores
+        
+        Returns: (flat_ids, lengths) - all token ids concatenated, and the token count per text
+        """
+        if not getattr(self.tokenizer, "is_fast", False):
+            print("⚠ Slow (pure-Python) tokenizer in use, install `tokenizers` for faster tokenization")
+        
+        id_slices = []
+        length_slices = []
+        for start in range(0, len(texts), TOKENIZE_CHUNK_SIZE):
+            input_ids = self.tokenizer(
+                texts[start:start + TOKENIZE_CHUNK_SIZE],
+                padding=False,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_attention_mask=False,
+                return_token_type_ids=False
+            )["input_ids"]
+            lengths = np.fromiter((len(ids) for ids in input_ids), dtype=np.int64, count=len(input_ids))
+            length_slices.append(lengths)
+            id_slices.append(np.fromiter(itertools.chain.from_iterable(input_ids), dtype=np.int32, count=int(lengths.sum())))
+        
+        if not length_slices:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+        return np.concatenate(id_slices), np.concatenate(length_slices)
+    
+    def _embed_tokenized(self, flat_ids: np.ndarray, lengths: np.ndarray, batch_size: int) -> np.ndarray:
+        """
+        Embed pre-tokenized texts (see _tokenize)
+        Batches are length-sorted and padded only to their own longest sequence
+        
+        Returns: float32 embeddings in the original text order
+        """
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        order = np.argsort(lengths, kind="stable")
+        pad_id = self.tokenizer.pad_token_id or 0
+        embeddings = np.empty((len(lengths), self.embedding_dim), dtype=np.float32)
+        
+        for start in tqdm(range(0, len(order), batch_size), desc="Batches"):
+            batch_rows = order[start:start + batch_size]
+            max_len = int(lengths[batch_rows].max())
+            
+            input_ids = np.full((len(batch_rows), max_len), pad_id, dtype=np.int64)
+            attention_mask = np.zeros((len(batch_rows), max_len), dtype=np.int64)
+            for i, row in enumerate(batch_rows):
+                length = lengths[row]
+                input_ids[i, :length] = flat_ids[offsets[row]:offsets[row] + length]
+                attention_mask[i, :length] = 1
+            
+            embeddings[batch_rows] = self._embed_tokens(input_ids, attention_mask)
+        
+        return embeddings
+    
+    def _embed_tokens(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """
+        Forward pass only (no tokenization) on a padded batch, returning unit-norm float32 embeddings
+        """
+        if self.backend == BACKEND_ONNX_INT8:
+            return self.model.embed_tokens(input_ids, attention_mask)
+        
+        import torch
+        
+        features = {
+            "input_ids": torch.from_numpy(input_ids).to(self.device),
+            "attention_mask": torch.from_numpy(attention_mask).to(self.device)
+        }
+        with torch.no_grad(), self._inference_context():
+            output = self.model(features)["sentence_embedding"]
+        
+        embeddings = output.float().cpu().numpy()
+        embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+
+def quantize_embeddings(embeddings: np.ndarray, storage_dtype: str = DEFAULT_STORAGE_DTYPE) -> np.ndarray:
+    """
+    Convert unit-norm float embeddings to the on-disk storage dtype
+    int8 values dequantize as: embedding = stored.astype(float32) * INT8_EMBEDDING_SCALE
+    """
+    if storage_dtype == STORAGE_DTYPE_INT8:
+        return np.clip(np.round(embeddings / INT8_EMBEDDING_SCALE), -127, 127).astype(np.int8)
+    if storage_dtype == STORAGE_DTYPE_FLOAT16:
+        return embeddings.astype(np.float16)
+    return np.ascontiguousarray(embeddings, dtype=np.float32)
 
 
-def save_chunks_with_embeddings(chunks: List[Dict], output_directory: str = "", output_file: str = CHUNKS_WITH_EMBEDDINGS_FILE):
+def save_chunks_with_embeddings(
+    chunks: Dict,
+    embeddings: np.ndarray,
+    output_directory: str = "",
+    storage_dtype: str = DEFAULT_STORAGE_DTYPE
+):
     """
-    Save chunks with embeddings to JSON file
+    Save chunks and embeddings in binary form:
+    embeddings as a .npy matrix (float32, float16 or int8) and chunk text + metadata as a Parquet table
+    Falls back to a single JSON file (float32 embeddings) when pyarrow is not installed
     """
-    output_path = Path(output_directory) / output_file
+    output_dir = Path(output_directory)
+    num_chunks = len(chunks["text"])
     
-    print(f"Saving {len(chunks)} chunks to {output_path}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(chunks, f, indent=2, ensure_ascii=False)
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        pa = None
     
-    print(f"✓ Saved to {output_path}")
+    if pa is not None:
+        embeddings_path = output_dir / EMBEDDINGS_FILE
+        chunks_path = output_dir / CHUNKS_FILE
+        
+        print(f"Saving {num_chunks} embeddings to {embeddings_path}...")
+        np.save(embeddings_path, quantize_embeddings(embeddings, storage_dtype))
+        
+        print(f"Saving {num_chunks} chunks to {chunks_path}...")
+        table = pa.table({name: chunks[name] for name in CHUNK_COLUMNS})
+        pq.write_table(table, chunks_path)
+        
+        print(f"✓ Saved to {chunks_path} and {embeddings_path}")
+        storage_format = "parquet+npy"
+    else:
+        output_path = output_dir / CHUNKS_WITH_EMBEDDINGS_FILE
+        
+        print("⚠ pyarrow not found, falling back to JSON output")
+        print(f"Saving {num_chunks} chunks to {output_path}...")
+        # Records are written one at a time, so neither the record list nor the
+        # full matrix as nested Python floats is ever materialized
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if orjson is not None:
+            # orjson serializes each numpy row view directly, no list conversion needed
+            with open(output_path, 'wb') as f:
+                f.write(b"[")
+                for i, record in enumerate(iter_chunk_records(chunks)):
+                    if i:
+                        f.write(b",")
+                    record["embedding"] = embeddings[i]
+                    f.write(orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY))
+                f.write(b"]")
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write("[")
+                for i, record in enumerate(iter_chunk_records(chunks)):
+                    if i:
+                        f.write(",")
+                    record["embedding"] = embeddings[i].tolist()
+                    # Compact separators and ASCII escaping keep the stdlib encoder on its fast path
+                    f.write(json.dumps(record, separators=(",", ":"), ensure_ascii=True))
+                f.write("]")
+        
+        print(f"✓ Saved to {output_path}")
+        storage_format = "json"
+        storage_dtype = STORAGE_DTYPE_FLOAT32
     
-    # Also save a summary
+    # Also save a summary (text lengths computed once, in a single pass)
+    text_lengths = np.fromiter(map(len, chunks["text"]), dtype=np.int64, count=num_chunks)
+    total_characters = int(text_lengths.sum())
     summary = {
-        "total_chunks": len(chunks),
-        "embedding_dimension": len(chunks[0]["embedding"]) if chunks else 0,
-        "papers": list(set(chunk["metadata"]["arxiv_id"] for chunk in chunks)),
-        "avg_chunk_length": np.mean([len(chunk["text"]) for chunk in chunks]),
-        "total_characters": sum(len(chunk["text"]) for chunk in chunks)
+        "total_chunks": num_chunks,
+        "embedding_dimension": int(embeddings.shape[1]) if num_chunks else 0,
+        "storage_format": storage_format,
+        "embedding_dtype": storage_dtype,
+        "dequantization": (
+            f"embedding = stored.astype(float32) * {INT8_EMBEDDING_SCALE!r}"
+            if storage_dtype == STORAGE_DTYPE_INT8 else "embedding = stored.astype(float32)"
+        ),
+        "papers": list(set(chunks["arxiv_id"])),
+        "avg_chunk_length": total_characters / num_chunks if num_chunks else 0.0,
+        "total_characters": total_characters
     }
     
-    summary_path = Path(output_directory) / EMBEDDING_SUMMARY_FILE
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    summary_path = output_dir / EMBEDDING_SUMMARY_FILE
+    if orjson is not None:
+        with open(summary_path, 'wb') as f:
+            f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
     
     print(f"✓ Summary saved to {summary_path}")
     return summary
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description='Chunk extracted papers and generate embeddings'
+    )
+    parser.add_argument(
+        '--backend',
+        type=str,
+        choices=EMBEDDING_BACKENDS,
+        default=BACKEND_TORCH,
+        help=f'Embedding backend (default: {BACKEND_TORCH})'
+    )
+    parser.add_argument(
+        '--embedding-dtype',
+        type=str,
+        choices=EMBEDDING_STORAGE_DTYPES,
+        default=DEFAULT_STORAGE_DTYPE,
+        help=f'Dtype used to store embeddings on disk (default: {DEFAULT_STORAGE_DTYPE})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-embed every chunk instead of reusing embeddings from previous runs'
+    )
+    
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("Chunking and Embedding Pipeline")
     print("=" * 80)
@@ -280,13 +1141,21 @@ def main():
     print()
     
     # Step 2: Generate embeddings
-    embedder = EmbeddingGenerator()
-    chunks_with_embeddings = embedder.generate_embeddings(chunks)
+    embedder = EmbeddingGenerator(backend=args.backend)
+    cache = None if args.no_cache else ChunkCache(
+        OUTPUT_DIR, model_name=embedder.model_name, numeric_path=embedder.numeric_path
+    )
+    chunks, embeddings = embedder.generate_embeddings(chunks, cache=cache)
     
     print()
     
     # Step 3: Save results
-    summary = save_chunks_with_embeddings(chunks=chunks_with_embeddings, output_directory=OUTPUT_DIR)
+    summary = save_chunks_with_embeddings(
+        chunks=chunks,
+        embeddings=embeddings,
+        output_directory=OUTPUT_DIR,
+        storage_dtype=args.embedding_dtype
+    )
     
     print()
     print("=" * 80)
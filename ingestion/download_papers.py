@@ -3,14 +3,26 @@ Download arXiv Papers Script
 Downloads PDF papers from arXiv based on the pending_papers.json file
 """
 
+import asyncio
+import os
 import re
+import shutil
 import requests
 import threading
 import json
 import argparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Tuple
+
+try:
+    import aiohttp
+    import aiofiles
+except ImportError:
+    aiohttp = None
+    aiofiles = None
 
 # arXiv download URLs
 BASE_URLS = ["https://arxiv.org/pdf", "https://arxiv.org/pdf/hep-th", "https://arxiv.org/pdf/hep-ph"]
@@ -18,22 +30,34 @@ BASE_URLS = ["https://arxiv.org/pdf", "https://arxiv.org/pdf/hep-th", "https://a
 # Directory and file defaults
 DEFAULT_PAPERS_DIR = "data"
 DEFAULT_LIST_FILE = "pending_papers.json"
+URL_CACHE_FILE = ".url_cache.json"  # arXiv ID -> URL that served the PDF last time, kept in the papers dir
 
 # Download configuration
-DEFAULT_VERSION = "v1"
 OLD_FORMAT_LENGTH = 7
 DEFAULT_TIMEOUT = 30
-DOWNLOAD_CHUNK_SIZE = 8192
+HEAD_TIMEOUT = 5
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB copy buffer, amortizes per-write syscall overhead
 MIN_PDF_SIZE_BYTES = 1000
 PDF_MAGIC_BYTES = b'%PDF'
 
 # HTTP configuration
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+HTTP_RETRY_TOTAL = 5
+HTTP_RETRY_BACKOFF = 1.0  # Seconds; doubles on every retry unless the server sends Retry-After
+HTTP_RETRY_STATUSES = [429, 500, 502, 503, 504]
+MAX_RETRY_AFTER = 60  # Cap on a server-requested Retry-After delay, in seconds
+MAX_REQUESTS_PER_HOST = 8  # Concurrent requests to arxiv.org, regardless of worker count
+POOL_SIZE_MULTIPLIER = 2  # Keep-alive connections per worker thread
 
-# Threading configuration
+# Threading configuration (fallback when aiohttp is not installed)
 DEFAULT_CPU_COUNT = 4
 WORKER_MULTIPLIER = 2
 
+# Async download configuration
+ASYNC_MAX_CONCURRENCY = 16  # Papers downloading at once
+ASYNC_CONNECTION_LIMIT = 64
+ASYNC_CONNECTION_LIMIT_PER_HOST = MAX_REQUESTS_PER_HOST
+
 # User interaction
 CONFIRMATION_RESPONSE = "y"
 
@@ -44,9 +68,23 @@ class ArxivDownloader:
         self.list_file = Path(list_file)
         # Thread-safe lock for printing
         self.print_lock = threading.Lock()
+        # Per-host politeness limit shared by all download threads
+        self._host_sem = threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST)
         # Counter for progress tracking
         self.completed_count = 0
         self.total_count = 0
+        # One session shared by all worker threads, so keep-alive connections to arxiv.org are reused
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT
+        })
+        self._mount_adapter((os.cpu_count() or DEFAULT_CPU_COUNT) * WORKER_MULTIPLIER)
+        # Paper ID -> already downloaded PDF name, built by one directory scan per run
+        self._existing = None
+        # arXiv ID -> {url, etag, last_modified} learned by earlier runs
+        self.url_cache_file = self.papers_dir / URL_CACHE_FILE
+        self._url_cache = self._load_url_cache()
+        self._url_cache_dirty = False
         
     def extract_arxiv_ids_from_json(self, json_file: str) -> List[str]:
         """Extract arXiv IDs from a JSON file with paper metadata"""
@@ -101,113 +139,332 @@ class ArxivDownloader:
         
         return url_id, filename
     
+    def _load_url_cache(self) -> Dict[str, Dict[str, str]]:
+        """Load the winning-URL cache from a previous run (empty if missing or unreadable)"""
+        try:
+            with open(self.url_cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠ Ignoring unreadable URL cache {self.url_cache_file}: {e}")
+            return {}
+    
+    def _save_url_cache(self):
+        """Persist the URL cache if this run learned anything new (atomic replace)"""
+        if not self._url_cache_dirty:
+            return
+        tmp_file = self.url_cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._url_cache, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.url_cache_file)
+        self._url_cache_dirty = False
+    
+    def _cached_url(self, arxiv_id: str):
+        """URL that served this paper last time, if any"""
+        entry = self._url_cache.get(arxiv_id)
+        return entry.get('url') if isinstance(entry, dict) else None
+    
+    def _remember_url(self, arxiv_id: str, url: str, headers):
+        """
+        Record the URL that served a paper, with its validators for future conditional GETs
+        Called from worker threads, so the update happens under print_lock
+        """
+        entry = {'url': url}
+        for header, key in (('etag', 'etag'), ('last-modified', 'last_modified')):
+            value = headers.get(header)
+            if value:
+                entry[key] = value
+        with self.print_lock:
+            if self._url_cache.get(arxiv_id) != entry:
+                self._url_cache[arxiv_id] = entry
+                self._url_cache_dirty = True
+    
+    def _candidate_urls(self, arxiv_id: str) -> List[str]:
+        """Candidate URLs for a paper, with the URL cached by a previous run tried first"""
+        urls = self.get_arxiv_urls(arxiv_id)
+        cached_url = self._cached_url(arxiv_id)
+        if cached_url:
+            urls = [cached_url] + [url for url in urls if url != cached_url]
+        return urls
+    
+    @staticmethod
+    def _needs_probe(arxiv_id: str) -> bool:
+        """
+        Whether candidate URLs should be HEAD-probed before downloading
+        New-format IDs (YYMM.NNNNN) have one near-certain URL (arxiv.org/pdf/<id> redirects to the
+        latest version), so they are fetched directly; old-format IDs fan out over several guesses
+        """
+        return '.' not in arxiv_id
+    
     def get_arxiv_urls(self, arxiv_id: str) -> List[str]:
         """
-        Generate possible arXiv PDF URLs for all base URLs and cases
-        Handles: with/without version, old format (7 digits) vs new format (YYYY.NNNNN)
+        Generate possible arXiv PDF URLs, most likely first
+        New-format IDs (YYMM.NNNNN) only live under arxiv.org/pdf; the hep-th/hep-ph
+        bases and the split-path variant are only tried for old-format (7 digit) IDs
         """
+        # Remove duplicates while preserving order (dicts keep insertion order)
+        return list(dict.fromkeys(self._gen_urls(arxiv_id)))
+    
+    def _gen_urls(self, arxiv_id: str) -> Iterator[str]:
+        """Yield candidate URLs for get_arxiv_urls in order of likelihood"""
         url_id, filename = self.normalize_arxiv_id(arxiv_id)
-        urls = []
         
         # Check if original ID had a version number
         has_version = 'v' in arxiv_id
         version = arxiv_id.split('v')[1] if has_version else None
         
-        # Generate URLs for each base URL
-        for base_url in BASE_URLS:
-            # Case 1: Without version suffix
-            urls.append(f"{base_url}/{url_id}.pdf")
+        is_old_format = '.' not in url_id
+        base_urls = BASE_URLS if is_old_format else BASE_URLS[:1]
+        
+        for base_url in base_urls:
+            # Case 1: Without version suffix (arXiv serves the latest version)
+            yield f"{base_url}/{url_id}.pdf"
             
             # Case 2: With version suffix (if original had one)
             if has_version and version:
-                urls.append(f"{base_url}/{url_id}v{version}.pdf")
+                yield f"{base_url}/{url_id}v{version}.pdf"
             
-            # Case 3: Try with v1 (common default version)
-            urls.append(f"{base_url}/{url_id}{DEFAULT_VERSION}.pdf")
-            
-            # Case 4: For old format (7 digits), try without leading zeros variations
-            if len(url_id) == OLD_FORMAT_LENGTH and not '.' in url_id:
-                # Some old papers might be accessed differently
-                urls.append(f"{base_url}/{url_id[:2]}/{url_id[2:]}.pdf")
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_urls = []
-        for url in urls:
-            if url not in seen:
-                seen.add(url)
-                unique_urls.append(url)
-        
-        return unique_urls
-    
-    def _create_session(self) -> requests.Session:
-        """Create a new requests session for a thread"""
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': USER_AGENT
-        })
-        return session
+            # Case 3: For old format (7 digits), some papers are accessed by a split path
+            if is_old_format and len(url_id) == OLD_FORMAT_LENGTH:
+                yield f"{base_url}/{url_id[:2]}/{url_id[2:]}.pdf"
+    
+    @staticmethod
+    def _is_pdf_head(status: int, headers) -> bool:
+        """Whether a HEAD probe's status and headers say the URL resolves to a PDF"""
+        return status == 200 and 'pdf' in headers.get('content-type', '').lower()
+    
+    def _is_pdf_url(self, url: str) -> bool:
+        """
+        Cheap HEAD probe: True if the URL resolves to a PDF
+        Avoids streaming 404 / HTML bodies for candidates that don't exist
+        """
+        response = self.session.head(url, timeout=HEAD_TIMEOUT, allow_redirects=True)
+        return self._is_pdf_head(response.status_code, response.headers)
+    
+    def _mount_adapter(self, max_workers: int):
+        """
+        Size the shared session's connection pool for max_workers threads
+        Throttling (429) and transient server errors are retried on the same URL by urllib3,
+        honoring Retry-After and otherwise backing off exponentially
+        """
+        retry = Retry(
+            total=HTTP_RETRY_TOTAL,
+            backoff_factor=HTTP_RETRY_BACKOFF,
+            status_forcelist=HTTP_RETRY_STATUSES,
+            allowed_methods=["GET", "HEAD"],
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(
+            pool_connections=max_workers,
+            pool_maxsize=max_workers * POOL_SIZE_MULTIPLIER,
+            max_retries=retry
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def _scan_existing(self) -> Dict[str, str]:
+        """
+        Map each paper ID (version suffix stripped) to an existing PDF in papers_dir
+        One os.scandir pass, so per-paper existence checks are dict lookups
+        """
+        existing = {}
+        with os.scandir(self.papers_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.pdf'):
+                    existing.setdefault(entry.name[:-len('.pdf')].split('v')[0], entry.name)
+        return existing
+    
+    def _existing_file(self, filename: str):
+        """Return the name of an already downloaded PDF for this paper, or None"""
+        if self._existing is None:
+            self._existing = self._scan_existing()
+        return self._existing.get(filename)
+    
+    @staticmethod
+    def _target_filename(content_disposition: str, filename: str) -> str:
+        """Determine filename (try to get from Content-Disposition or use arxiv_id)"""
+        if 'filename=' in content_disposition:
+            return re.findall(r'filename="?([^"]+)"?', content_disposition)[0]
+        # Use the arxiv ID as filename
+        return f"{filename}.pdf"
+    
+    def _download_attempts(self, arxiv_id: str) -> List[Tuple[str, bool]]:
+        """
+        Candidate URLs in the order to try them, each with whether to HEAD-probe it first
+        The URL that worked last run comes first and is fetched without a probe
+        """
+        url_id, _ = self.normalize_arxiv_id(arxiv_id)
+        cached_url = self._cached_url(arxiv_id)
+        probe = self._needs_probe(url_id)
+        return [(url, probe and url != cached_url) for url in self._candidate_urls(arxiv_id)]
+    
+    def _accept_response(self, url: str, status: int, headers, filename: str):
+        """
+        Check a GET response before reading its body
+        Returns: the path to write the PDF to, or None to try the next URL
+        """
+        if status != 200:
+            return None
+        # Check if it's actually a PDF
+        content_type = headers.get('content-type', '')
+        if 'pdf' not in content_type.lower() and not url.endswith('.pdf'):
+            return None
+        return self.papers_dir / self._target_filename(headers.get('content-disposition', ''), filename)
+    
+    def _finish_download(self, arxiv_id: str, url: str, headers, filepath: Path, bytes_written: int) -> bool:
+        """
+        Keep a written PDF if it is complete (size known from the write, no stat/reopen),
+        remembering the URL that served it; otherwise delete it so the next URL is tried
+        """
+        if bytes_written > MIN_PDF_SIZE_BYTES:  # At least 1KB
+            self._remember_url(arxiv_id, url, headers)
+            return True
+        filepath.unlink(missing_ok=True)
+        return False
     
     def download_paper(self, arxiv_id: str) -> Tuple[bool, str, int]:
         """
         Download a paper from arXiv
         Returns: (success, message, index)
-        Note: Each thread gets its own session for thread safety
+        Note: All threads share self.session; urllib3's connection pool is thread-safe
         """
-        # Create a session for this thread
-        session = self._create_session()
-        url_id, filename = self.normalize_arxiv_id(arxiv_id)
+        session = self.session
+        _, filename = self.normalize_arxiv_id(arxiv_id)
         
         # Check if file already exists (thread-safe file check)
-        existing_files = list(self.papers_dir.glob(f"{filename}*.pdf"))
-        if existing_files:
-            return True, f"Already exists: {existing_files[0].name}", 0
+        existing_file = self._existing_file(filename)
+        if existing_file:
+            return True, f"Already exists: {existing_file}", 0
         
-        # Try different URL formats
-        urls = self.get_arxiv_urls(arxiv_id)
+        # Try different URL formats, the one that worked last run first
+        attempts = self._download_attempts(arxiv_id)
         
-        for url in urls:
+        for url, probe in attempts:
             try:
-                response = session.get(url, timeout=DEFAULT_TIMEOUT, stream=True)
-                
-                if response.status_code == 200:
-                    # Check if it's actually a PDF
-                    content_type = response.headers.get('content-type', '')
-                    if 'pdf' not in content_type.lower() and not url.endswith('.pdf'):
+                # At most MAX_REQUESTS_PER_HOST threads talk to arxiv.org at once
+                with self._host_sem:
+                    if probe and not self._is_pdf_url(url):
                         continue
                     
-                    # Determine filename (try to get from Content-Disposition or use arxiv_id)
-                    content_disposition = response.headers.get('content-disposition', '')
-                    if 'filename=' in content_disposition:
-                        downloaded_filename = re.findall(r'filename="?([^"]+)"?', content_disposition)[0]
-                    else:
-                        # Use the arxiv ID as filename
-                        downloaded_filename = f"{filename}.pdf"
-                    
-                    filepath = self.papers_dir / downloaded_filename
-                    
-                    # Download the file
-                    with open(filepath, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
-                            f.write(chunk)
-                    
-                    # Verify it's a valid PDF
-                    if filepath.stat().st_size > MIN_PDF_SIZE_BYTES:  # At least 1KB
-                        with open(filepath, 'rb') as f:
-                            if f.read(4) == PDF_MAGIC_BYTES:
-                                session.close()
-                                return True, f"Downloaded: {downloaded_filename}", 0
-                    
-                    # If invalid, delete and try next URL
-                    filepath.unlink()
+                    # Closing the response returns its connection to the shared pool
+                    with session.get(url, timeout=DEFAULT_TIMEOUT, stream=True) as response:
+                        filepath = self._accept_response(url, response.status_code, response.headers, filename)
+                        if filepath is None:
+                            continue
+                        
+                        # Peek at the magic bytes before creating the file
+                        response.raw.decode_content = True
+                        magic = response.raw.read(len(PDF_MAGIC_BYTES))
+                        if magic != PDF_MAGIC_BYTES:
+                            continue
+                        
+                        # Stream the rest of the body straight to disk in large blocks
+                        with open(filepath, 'wb') as f:
+                            f.write(magic)
+                            shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+                            bytes_written = f.tell()
+                
+                if self._finish_download(arxiv_id, url, response.headers, filepath, bytes_written):
+                    return True, f"Downloaded: {filepath.name}", 0
                     
             except requests.exceptions.RequestException as e:
                 continue
             except Exception as e:
                 continue
         
-        session.close()
-        return False, f"Failed to download (tried {len(urls)} URLs)", 0
+        return False, f"Failed to download (tried {len(attempts)} URLs)", 0
+    
+    @staticmethod
+    def _retry_delay(retry_after: str, attempt: int) -> float:
+        """Seconds to wait before retrying: the server's Retry-After if given, else exponential backoff"""
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_AFTER)
+        return HTTP_RETRY_BACKOFF * (2 ** attempt)
+    
+    async def _request_with_backoff_async(self, session, method: str, url: str, **kwargs):
+        """
+        Issue a request, retrying throttling and transient server errors on the same URL
+        (like the urllib3 Retry of the threaded path) instead of falling through to the next candidate
+        Returns: the final aiohttp response (use it as an async context manager to release it)
+        """
+        for attempt in range(HTTP_RETRY_TOTAL):
+            response = await session.request(method, url, **kwargs)
+            if response.status not in HTTP_RETRY_STATUSES:
+                return response
+            delay = self._retry_delay(response.headers.get('retry-after'), attempt)
+            response.release()
+            await asyncio.sleep(delay)
+        return await session.request(method, url, **kwargs)
+    
+    async def _is_pdf_url_async(self, session, url: str) -> bool:
+        """Async counterpart of _is_pdf_url"""
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=HEAD_TIMEOUT, sock_read=HEAD_TIMEOUT)
+        async with await self._request_with_backoff_async(
+            session, 'HEAD', url, timeout=timeout, allow_redirects=True
+        ) as response:
+            return self._is_pdf_head(response.status, response.headers)
+    
+    async def download_paper_async(self, session, host_sem, arxiv_id: str) -> Tuple[bool, str, int]:
+        """
+        Download a paper from arXiv on the event loop (same URL order and checks as download_paper)
+        host_sem: asyncio.Semaphore shared by all downloads, held across probe and GET like _host_sem
+        Returns: (success, message, index)
+        """
+        _, filename = self.normalize_arxiv_id(arxiv_id)
+        
+        # Check if file already exists
+        existing_file = self._existing_file(filename)
+        if existing_file:
+            return True, f"Already exists: {existing_file}", 0
+        
+        # Try different URL formats, the one that worked last run first
+        attempts = self._download_attempts(arxiv_id)
+        # No total budget: it would count time queued for a free connection and the whole
+        # body read of large PDFs; bound connect and stalls instead
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=HEAD_TIMEOUT, sock_read=DEFAULT_TIMEOUT)
+        
+        for url, probe in attempts:
+            try:
+                # At most MAX_REQUESTS_PER_HOST downloads talk to arxiv.org at once
+                async with host_sem:
+                    if probe and not await self._is_pdf_url_async(session, url):
+                        continue
+                    
+                    async with await self._request_with_backoff_async(session, 'GET', url, timeout=timeout) as response:
+                        filepath = self._accept_response(url, response.status, response.headers, filename)
+                        if filepath is None:
+                            continue
+                        
+                        # Peek at the magic bytes before creating the file
+                        magic = await response.content.readexactly(len(PDF_MAGIC_BYTES))
+                        if magic != PDF_MAGIC_BYTES:
+                            continue
+                        
+                        # Stream the rest of the body to disk without blocking the loop
+                        bytes_written = len(magic)
+                        async with aiofiles.open(filepath, 'wb') as f:
+                            await f.write(magic)
+                            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                                await f.write(chunk)
+                                bytes_written += len(chunk)
+                
+                if self._finish_download(arxiv_id, url, response.headers, filepath, bytes_written):
+                    return True, f"Downloaded: {filepath.name}", 0
+                
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                continue
+            except Exception as e:
+                continue
+        
+        return False, f"Failed to download (tried {len(attempts)} URLs)", 0
+    
+    def _report_progress(self, arxiv_id: str, success: bool, message: str):
+        """Print one progress line (caller makes it thread-safe where needed)"""
+        self.completed_count += 1
+        status = "✓" if success else "✗"
+        print(f"[{self.completed_count}/{self.total_count}] {status} arXiv:{arxiv_id} - {message}")
     
     def _download_with_progress(self, arxiv_id: str, index: int) -> Tuple[str, bool, str]:
         """Wrapper for download_paper that tracks progress"""
@@ -215,12 +472,66 @@ class ArxivDownloader:
         
         # Thread-safe progress update
         with self.print_lock:
-            self.completed_count += 1
-            status = "✓" if success else "✗"
-            print(f"[{self.completed_count}/{self.total_count}] {status} arXiv:{arxiv_id} - {message}")
+            self._report_progress(arxiv_id, success, message)
+        
+        return arxiv_id, success, message
+    
+    async def _download_with_progress_async(
+        self, session, semaphore, host_sem, arxiv_id: str
+    ) -> Tuple[str, bool, str]:
+        """Wrapper for download_paper_async that limits concurrency and tracks progress"""
+        async with semaphore:
+            success, message, _ = await self.download_paper_async(session, host_sem, arxiv_id)
         
+        # Single event-loop thread, no lock needed
+        self._report_progress(arxiv_id, success, message)
         return arxiv_id, success, message
     
+    def _start_run(self, arxiv_ids: List[str], concurrency_description: str):
+        """Reset progress counters, rescan existing downloads and print the run header"""
+        self.total_count = len(arxiv_ids)
+        self.completed_count = 0
+        self._existing = self._scan_existing()
+        
+        print("=" * 80)
+        print(f"Downloading {len(arxiv_ids)} papers from arXiv")
+        print(f"Output directory: {self.papers_dir}")
+        print(f"Using {concurrency_description}")
+        print("=" * 80)
+        print()
+    
+    @staticmethod
+    def _record_result(results: Dict[str, List[str]], arxiv_id: str, success: bool, message: str):
+        """File one download outcome under success / skipped / failed"""
+        if success:
+            if "Already exists" in message:
+                results['skipped'].append(arxiv_id)
+            else:
+                results['success'].append(arxiv_id)
+        else:
+            results['failed'].append(arxiv_id)
+    
+    def _print_summary(self, results: Dict[str, List[str]]):
+        """Print the download summary and manual commands for failed papers"""
+        print()
+        print("=" * 80)
+        print("Download Summary")
+        print("=" * 80)
+        print(f"Successfully downloaded: {len(results['success'])}")
+        print(f"Skipped (already exists): {len(results['skipped'])}")
+        print(f"Failed: {len(results['failed'])}")
+        
+        if results['failed']:
+            print()
+            print("Failed papers:")
+            for arxiv_id in results['failed']:
+                print(f"  - arXiv:{arxiv_id}")
+            print()
+            print("You can try downloading these manually:")
+            for arxiv_id in results['failed']:
+                url_id, _ = self.normalize_arxiv_id(arxiv_id)
+                print(f"  wget https://arxiv.org/pdf/{url_id}.pdf -O {self.papers_dir}/{arxiv_id}.pdf")
+    
     def download_all(self, arxiv_ids: List[str] = None, max_workers: int = None):
         """
         Download all papers from the list in parallel
@@ -235,18 +546,10 @@ class ArxivDownloader:
         
         # Determine number of workers (use CPU count * 2 for I/O-bound downloads)
         if max_workers is None:
-            import os
             max_workers = min(len(arxiv_ids), (os.cpu_count() or DEFAULT_CPU_COUNT) * WORKER_MULTIPLIER)
+        self._mount_adapter(max_workers)
         
-        self.total_count = len(arxiv_ids)
-        self.completed_count = 0
-        
-        print("=" * 80)
-        print(f"Downloading {len(arxiv_ids)} papers from arXiv")
-        print(f"Output directory: {self.papers_dir}")
-        print(f"Using {max_workers} parallel threads")
-        print("=" * 80)
-        print()
+        self._start_run(arxiv_ids, f"{max_workers} parallel threads")
         
         results = {
             'success': [],
@@ -264,35 +567,46 @@ class ArxivDownloader:
             
             # Process completed downloads as they finish
             for future in as_completed(future_to_id):
-                arxiv_id, success, message = future.result()
-                
-                if success:
-                    if "Already exists" in message:
-                        results['skipped'].append(arxiv_id)
-                    else:
-                        results['success'].append(arxiv_id)
-                else:
-                    results['failed'].append(arxiv_id)
-        
-        # Print summary
-        print()
-        print("=" * 80)
-        print("Download Summary")
-        print("=" * 80)
-        print(f"Successfully downloaded: {len(results['success'])}")
-        print(f"Skipped (already exists): {len(results['skipped'])}")
-        print(f"Failed: {len(results['failed'])}")
+                self._record_result(results, *future.result())
         
-        if results['failed']:
-            print()
-            print("Failed papers:")
-            for arxiv_id in results['failed']:
-                print(f"  - arXiv:{arxiv_id}")
-            print()
-            print("You can try downloading these manually:")
-            for arxiv_id in results['failed']:
-                url_id, _ = self.normalize_arxiv_id(arxiv_id)
-                print(f"  wget https://arxiv.org/pdf/{url_id}.pdf -O {self.papers_dir}/{arxiv_id}.pdf")
+        self._save_url_cache()
+        self._print_summary(results)
+    
+    async def download_all_async(self, arxiv_ids: List[str] = None, max_concurrency: int = ASYNC_MAX_CONCURRENCY):
+        """
+        Download all papers concurrently on a single asyncio event loop (requires aiohttp and aiofiles)
+        max_concurrency: Number of papers downloading at once (kept modest to be polite to arxiv.org)
+        """
+        if arxiv_ids is None:
+            arxiv_ids = self.extract_arxiv_ids_from_json(str(self.list_file))
+        
+        if not arxiv_ids:
+            print("No arXiv IDs found!")
+            return
+        
+        self._start_run(arxiv_ids, f"asyncio with up to {max_concurrency} concurrent downloads")
+        
+        results = {
+            'success': [],
+            'skipped': [],
+            'failed': []
+        }
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        host_sem = asyncio.Semaphore(MAX_REQUESTS_PER_HOST)
+        connector = aiohttp.TCPConnector(limit=ASYNC_CONNECTION_LIMIT, limit_per_host=ASYNC_CONNECTION_LIMIT_PER_HOST)
+        async with aiohttp.ClientSession(connector=connector, headers={'User-Agent': USER_AGENT}) as session:
+            tasks = [
+                self._download_with_progress_async(session, semaphore, host_sem, arxiv_id)
+                for arxiv_id in arxiv_ids
+            ]
+            
+            # Process completed downloads as they finish
+            for task in asyncio.as_completed(tasks):
+                self._record_result(results, *await task)
+        
+        self._save_url_cache()
+        self._print_summary(results)
 
 
 def main():
@@ -346,9 +660,13 @@ def main():
             print("Download cancelled.")
             return
     
-    # Download all papers in parallel
-    # Uses all available CPU cores * 2 (for I/O-bound tasks)
-    downloader.download_all(arxiv_ids)
+    # Download all papers concurrently on one event loop,
+    # or with a thread pool (CPU cores * 2) if aiohttp/aiofiles are missing
+    if aiohttp is not None:
+        asyncio.run(downloader.download_all_async(arxiv_ids))
+    else:
+        print("⚠ aiohttp/aiofiles not found, using threaded downloads")
+        downloader.download_all(arxiv_ids)
 
 
 if __name__ == "__main__":
@@ -4,85 +4,194 @@ Extracts text, symbols, and metadata from physics papers for RAG pipeline
 """
 
 import fitz  # PyMuPDF
+import argparse
+import contextlib
 import json
 import os
+import queue
 import threading
 from pathlib import Path
 from typing import Dict, List, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tqdm import tqdm
 import re
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Text cleanup patterns (compiled once at import)
+_RE_MULTI_NL = re.compile(r'\n\s*\n')  # Runs of blank lines
+_RE_MULTI_SP = re.compile(r' +')  # Runs of spaces
+_RE_PAGENO = re.compile(r'\n\s*\d+\s*\n')  # Page numbers alone on a line
+
+# PyMuPDF plain-text extraction flags (no image blocks), passed explicitly on every page
+TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_IMAGES
+
 # Directory paths
 INPUT_DIR = 'data'
 OUTPUT_DIR = 'extracted_data'
 
 # File names
-ALL_PAPERS_FILE = "all_papers.json"
+ALL_PAPERS_FILE = "all_papers.jsonl"  # One paper per line, appended as extraction finishes
 EXTRACTION_REPORT_FILE = "extraction_report.txt"
+SHARD_FILE_TEMPLATE = "shard_{:05d}.jsonl"  # Used instead of per-paper JSON files with --shard-size-mb
+SHARD_INDEX_FILE = "index.json"  # arxiv_id -> [shard_id, byte_offset, length]
+BYTES_PER_MB = 1024 * 1024
+
+# Separator between page texts when a paper's full text is needed (see chunk_and_embed.paper_full_text)
+PAGE_SEPARATOR = "\n\n"
+
+# Summary report configuration
+PREVIEW_LENGTH = 200
 
 # Parallelization configuration
 DEFAULT_CPU_COUNT = 4
-WORKER_MULTIPLIER = 2
+WRITE_QUEUE_PER_WORKER = 2  # Serialized papers waiting for the writer thread, per worker process
+TASKS_PER_WORKER = 4  # PDFs are submitted in batches, about this many per worker process
+MAX_PDFS_PER_TASK = 32  # Bounds the results a single batch holds in memory
+
+# Progress bar throttling (redraw at most every PROGRESS_MIN_INTERVAL seconds, ~PROGRESS_MAX_REDRAWS times total)
+PROGRESS_MIN_INTERVAL = 0.2
+PROGRESS_MAX_REDRAWS = 200
+
+
+def _extract_pdf_batch_task(pdf_paths: List[str]) -> List[Tuple[Dict, bytes, bool, str]]:
+    """
+    Worker-process entry point (module-level so it can be pickled)
+    Extracts a batch of PDFs in one task, so per-task overhead is paid once per batch
+    Each paper is serialized here, once; the parent only queues the bytes for the writer thread
+    Returns: one (summary, json_bytes, success, message) tuple per PDF
+    """
+    extractor = PDFExtractor(max_workers=1)
+    results = []
+    for pdf_path in pdf_paths:
+        extracted_data, success, message = extractor.extract_text_from_pdf(Path(pdf_path))
+        if success:
+            results.append((PDFExtractor._paper_summary(extracted_data), _json_bytes(extracted_data), True, message))
+        else:
+            results.append((None, None, False, message))
+    
+    # Workers are long-lived; keep MuPDF's accumulated warning log from growing across batches
+    fitz.TOOLS.mupdf_warnings(reset=True)
+    return results
+
+
+def _json_bytes(data: Dict) -> bytes:
+    """
+    Compact UTF-8 JSON for one paper (orjson when installed, stdlib json otherwise)
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class JsonlShardWriter:
+    def __init__(self, output_dir: Path, shard_size_mb: float):
+        """
+        Pack serialized papers into a few JSONL shard files instead of one JSON file per paper
+        A new shard is started once the current one reaches shard_size_mb; index.json maps
+        each arxiv_id to [shard_id, byte_offset, length] so single papers can still be read
+        with one seek (or from a memory map of the shard)
+        """
+        self.output_dir = Path(output_dir)
+        self.max_shard_bytes = int(shard_size_mb * BYTES_PER_MB)
+        self.index = {}
+        self.shard_id = -1
+        self.file = None
+        self._open_next_shard()
+    
+    def _open_next_shard(self):
+        if self.file is not None:
+            self.file.close()
+        self.shard_id += 1
+        self.file = open(self.output_dir / SHARD_FILE_TEMPLATE.format(self.shard_id), 'wb')
+    
+    def write(self, arxiv_id: str, payload: bytes):
+        """Append one paper (compact JSON bytes) as a line of the current shard"""
+        offset = self.file.tell()
+        if offset and offset + len(payload) + 1 > self.max_shard_bytes:
+            self._open_next_shard()
+            offset = 0
+        self.file.write(payload)
+        self.file.write(b"\n")
+        self.index[arxiv_id] = [self.shard_id, offset, len(payload)]
+    
+    def close(self):
+        """Close the last shard and write index.json"""
+        self.file.close()
+        with open(self.output_dir / SHARD_INDEX_FILE, 'wb') as f:
+            f.write(_json_bytes(self.index))
+        print(f"✓ Wrote {len(self.index)} papers to {self.shard_id + 1} shard(s), index in {SHARD_INDEX_FILE}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
 
 class PDFExtractor:
-    def __init__(self, papers_dir: str = "", output_dir: str = "", max_workers: int = None):
+    def __init__(
+        self,
+        papers_dir: str = "",
+        output_dir: str = "",
+        max_workers: int = None,
+        shard_size_mb: float = None
+    ):
         self.papers_dir = Path(papers_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
-        # Thread-safe lock for printing
-        self.print_lock = threading.Lock()
-        # Determine number of workers
+        # Pack per-paper output into JSONL shards of this size (None: one JSON file per paper)
+        self.shard_size_mb = shard_size_mb
+        # Determine number of worker processes (extraction is CPU-bound, one per core)
         if max_workers is None:
-            self.max_workers = min((os.cpu_count() or DEFAULT_CPU_COUNT) * WORKER_MULTIPLIER, 32)
+            self.max_workers = os.cpu_count() or DEFAULT_CPU_COUNT
         else:
             self.max_workers = max_workers
         
     def extract_text_from_pdf(self, pdf_path: Path) -> Tuple[Dict, bool, str]:
         """
-        Extract text and metadata from a single PDF file
+        Extract text and metadata from a single PDF file (saving is done by the writer thread)
         Returns: (extracted_data, success, message)
         """
         try:
-            doc = fitz.open(pdf_path)
-            
-            extracted_data = {
-                "filename": pdf_path.name,
-                "arxiv_id": self._extract_arxiv_id(pdf_path.name),
-                "num_pages": len(doc),
-                "metadata": {},
-                "full_text": "",
-                "pages": []
-            }
-            
-            # Extract metadata
-            extracted_data["metadata"] = doc.metadata
-            
-            # Extract text from each page
-            full_text = []
-            for page_num, page in enumerate(doc, start=1):
-                page_text = page.get_text("text")
+            # MuPDF reads the file itself, so no second in-memory copy of the PDF is made
+            with fitz.open(pdf_path) as doc:
+                num_pages = len(doc)
                 
-                # Clean up the text
-                page_text = self._clean_text(page_text)
+                extracted_data = {
+                    "filename": pdf_path.name,
+                    "arxiv_id": self._extract_arxiv_id(pdf_path.name),
+                    "num_pages": num_pages,
+                    "char_count": 0,
+                    "metadata": {},
+                    "pages": [None] * num_pages  # Preallocated, filled in page order
+                }
                 
-                extracted_data["pages"].append({
-                    "page_number": page_num,
-                    "text": page_text
-                })
+                # Extract metadata
+                extracted_data["metadata"] = doc.metadata
                 
-                full_text.append(page_text)
-            
-            extracted_data["full_text"] = "\n\n".join(full_text)
-            
-            doc.close()
-            
-            # Save individual JSON file
-            output_file = self.output_dir / f"{extracted_data['arxiv_id']}.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(extracted_data, f, indent=2, ensure_ascii=False)
+                # Extract text from each page (page text is stored once; no separate full_text copy)
+                pages = extracted_data["pages"]
+                char_count = 0
+                for page_index, page in enumerate(doc):
+                    # Plain text in content-stream order (no sort pass)
+                    page_text = page.get_text("text", flags=TEXT_FLAGS, sort=False)
+                
+                    # Clean up the text
+                    page_text = self._clean_text(page_text)
+                
+                    pages[page_index] = {
+                        "page_number": page_index + 1,
+                        "text": page_text
+                    }
+                    char_count += len(page_text)
+                
+                extracted_data["char_count"] = char_count
             
-            message = f"✓ Extracted {extracted_data['num_pages']} pages, {len(extracted_data['full_text'])} characters"
+            message = f"✓ Extracted {extracted_data['num_pages']} pages, {extracted_data['char_count']} characters"
             return extracted_data, True, message
             
         except Exception as e:
@@ -100,79 +209,170 @@ class PDFExtractor:
         Clean extracted text while preserving mathematical symbols
         """
         # Remove excessive whitespace
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
+        text = _RE_MULTI_NL.sub('\n\n', text)
+        text = _RE_MULTI_SP.sub(' ', text)
         
         # Remove page numbers that appear alone on a line
-        text = re.sub(r'\n\s*\d+\s*\n', '\n', text)
+        text = _RE_PAGENO.sub('\n', text)
         
         return text.strip()
     
+    @staticmethod
+    def _paper_summary(extracted_data: Dict) -> Dict:
+        """
+        Light per-paper record kept for the summary report once the full text has been written
+        """
+        return {
+            "filename": extracted_data["filename"],
+            "arxiv_id": extracted_data["arxiv_id"],
+            "num_pages": extracted_data["num_pages"],
+            "title": extracted_data["metadata"].get("title"),
+            "char_count": extracted_data["char_count"],
+            "preview": PDFExtractor._text_preview(extracted_data["pages"])
+        }
+    
+    @staticmethod
+    def _text_preview(pages: List[Dict]) -> str:
+        """
+        First PREVIEW_LENGTH characters of the paper, joining only as many pages as needed
+        """
+        preview_pages = []
+        length = 0
+        for page in pages:
+            preview_pages.append(page["text"])
+            length += len(page["text"]) + len(PAGE_SEPARATOR)
+            if length >= PREVIEW_LENGTH:
+                break
+        return PAGE_SEPARATOR.join(preview_pages)[:PREVIEW_LENGTH]
+    
+    def _writer_loop(
+        self,
+        write_queue: queue.Queue,
+        combined_file,
+        shard_writer: JsonlShardWriter = None,
+        errors: List[BaseException] = None
+    ):
+        """
+        Writer thread: save each serialized paper to its own JSON file (or a shard) and append it
+        to all_papers.jsonl, so disk writes overlap with extraction; stops at a None sentinel
+        A per-paper OSError is reported and skipped; any other error is appended to errors and ends
+        writing, but the queue is still drained so the producer never blocks on it
+        """
+        failed = False
+        while (item := write_queue.get()) is not None:
+            if failed:
+                continue
+            arxiv_id, payload = item
+            try:
+                if shard_writer is not None:
+                    shard_writer.write(arxiv_id, payload)
+                else:
+                    with open(self.output_dir / f"{arxiv_id}.json", 'wb') as f:
+                        f.write(payload)
+                combined_file.write(payload)
+                combined_file.write(b"\n")
+            except OSError as e:
+                tqdm.write(f"  ✗ Error writing arXiv:{arxiv_id}: {str(e)}")
+            except Exception as e:
+                tqdm.write(f"  ✗ Writer stopped at arXiv:{arxiv_id}: {str(e)}")
+                if errors is not None:
+                    errors.append(e)
+                failed = True
+    
     def extract_all_pdfs(self) -> List[Dict]:
         """
         Extract text from all PDFs in the papers directory using parallel processing
+        Each paper is handed to a writer thread as soon as it is extracted and then dropped,
+        so memory stays bounded regardless of corpus size
+        Returns: one summary dict per paper (see _paper_summary)
         """
-        pdf_files = list(self.papers_dir.glob("*.pdf"))
+        # Largest files first, so huge PDFs start early instead of finishing last as stragglers
+        pdf_files = sorted(self.papers_dir.glob("*.pdf"), key=lambda path: path.stat().st_size, reverse=True)
         
         if not pdf_files:
             print(f"No PDF files found in {self.papers_dir}")
             return []
         
         print(f"Found {len(pdf_files)} PDF files to process")
-        print(f"Using {self.max_workers} parallel workers")
+        print(f"Using {self.max_workers} worker processes")
         print()
         
-        all_extracted_data = []
+        paper_summaries = []
         completed_count = 0
         total_count = len(pdf_files)
+        combined_file = self.output_dir / ALL_PAPERS_FILE
+        
+        # Single writer thread; the bounded queue applies backpressure if disk falls behind
+        write_queue = queue.Queue(maxsize=WRITE_QUEUE_PER_WORKER * self.max_workers)
+        write_errors = []
         
-        # Process PDFs in parallel
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all extraction tasks
-            future_to_file = {
-                executor.submit(self.extract_text_from_pdf, pdf_file): pdf_file
-                for pdf_file in pdf_files
+        # Process PDFs in parallel (PDF parsing is CPU-bound, so use processes, not threads)
+        shard_context = (
+            JsonlShardWriter(self.output_dir, self.shard_size_mb)
+            if self.shard_size_mb else contextlib.nullcontext()
+        )
+        with open(combined_file, 'wb') as cf, shard_context as shard_writer, \
+                ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            writer = threading.Thread(
+                target=self._writer_loop, args=(write_queue, cf, shard_writer, write_errors), daemon=True
+            )
+            writer.start()
+            
+            # Submit extraction tasks in batches of PDFs; files are striped across batches by size,
+            # so every batch gets a similar amount of work and the big ones are picked up first
+            batch_size = min(MAX_PDFS_PER_TASK, max(1, total_count // (self.max_workers * TASKS_PER_WORKER)))
+            num_batches = -(-total_count // batch_size)
+            future_to_batch = {
+                executor.submit(_extract_pdf_batch_task, [str(pdf_file) for pdf_file in batch]): batch
+                for batch in (pdf_files[i::num_batches] for i in range(num_batches))
             }
             
             # Process completed extractions as they finish
-            with tqdm(total=total_count, desc="Processing PDFs") as pbar:
-                for future in as_completed(future_to_file):
-                    pdf_file = future_to_file[future]
+            with tqdm(
+                total=total_count,
+                desc="Processing PDFs",
+                mininterval=PROGRESS_MIN_INTERVAL,
+                miniters=max(1, total_count // PROGRESS_MAX_REDRAWS)
+            ) as pbar:
+                for future in as_completed(future_to_batch):
                     try:
-                        extracted_data, success, message = future.result()
-                        
+                        results = future.result()
+                    except Exception as e:
+                        for pdf_file in future_to_batch[future]:
+                            tqdm.write(f"  ✗ Unexpected error processing {pdf_file.name}: {str(e)}")
+                        pbar.update(len(future_to_batch[future]))
+                        continue
+                    
+                    for summary, payload, success, message in results:
                         if success:
-                            all_extracted_data.append(extracted_data)
-                            with self.print_lock:
-                                completed_count += 1
-                                pbar.set_postfix_str(f"{completed_count}/{total_count} completed")
+                            # Queue the serialized paper for writing and keep only the summary
+                            write_queue.put((summary['arxiv_id'], payload))
+                            paper_summaries.append(summary)
+                            completed_count += 1
+                            # Shown on the next throttled redraw, not redrawn here
+                            pbar.set_postfix_str(f"{completed_count}/{total_count} completed", refresh=False)
                         else:
-                            with self.print_lock:
-                                print(f"  {message}")
+                            tqdm.write(f"  {message}")
                         
                         pbar.update(1)
-                        
-                    except Exception as e:
-                        with self.print_lock:
-                            print(f"  ✗ Unexpected error processing {pdf_file.name}: {str(e)}")
-                        pbar.update(1)
+            
+            # Let the writer drain the queue before the combined file is closed
+            write_queue.put(None)
+            writer.join()
+            if write_errors:
+                raise write_errors[0]
         
         # Sort by filename for consistent ordering
-        all_extracted_data.sort(key=lambda x: x['filename'])
-        
-        # Save combined data
-        combined_file = self.output_dir / ALL_PAPERS_FILE
-        with open(combined_file, 'w', encoding='utf-8') as f:
-            json.dump(all_extracted_data, f, indent=2, ensure_ascii=False)
+        paper_summaries.sort(key=lambda x: x['filename'])
         
-        print(f"\n✓ Successfully processed {len(all_extracted_data)} papers")
+        print(f"\n✓ Successfully processed {len(paper_summaries)} papers")
         print(f"✓ Saved to {self.output_dir}")
         
-        return all_extracted_data
+        return paper_summaries
     
     def generate_summary_report(self, extracted_data: List[Dict]):
         """
-        Generate a summary report of extracted papers
+        Generate a summary report of extracted papers (from extract_all_pdfs summaries)
         """
         report_file = self.output_dir / EXTRACTION_REPORT_FILE
         
@@ -187,26 +387,39 @@ class PDFExtractor:
                 f.write(f"\nPaper: {paper['filename']}\n")
                 f.write(f"  arXiv ID: {paper['arxiv_id']}\n")
                 f.write(f"  Pages: {paper['num_pages']}\n")
-                f.write(f"  Characters: {len(paper['full_text']):,}\n")
+                f.write(f"  Characters: {paper['char_count']:,}\n")
                 
                 # Extract title from metadata if available
-                if paper['metadata'].get('title'):
-                    f.write(f"  Title: {paper['metadata']['title']}\n")
+                if paper['title']:
+                    f.write(f"  Title: {paper['title']}\n")
                 
                 # Show first 200 characters of text
-                preview = paper['full_text'][:200].replace('\n', ' ')
+                preview = paper['preview'].replace('\n', ' ')
                 f.write(f"  Preview: {preview}...\n")
         
         print(f"✓ Summary report saved to {report_file}")
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description='Extract text from downloaded arXiv PDFs'
+    )
+    parser.add_argument(
+        '--shard-size-mb',
+        type=float,
+        default=None,
+        help='Pack per-paper output into JSONL shards of about this size, indexed by index.json '
+             '(default: one JSON file per paper)'
+    )
+    
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("Physics Papers PDF Extraction")
     print("=" * 80)
     print()
     
-    extractor = PDFExtractor(papers_dir=INPUT_DIR, output_dir=OUTPUT_DIR)
+    extractor = PDFExtractor(papers_dir=INPUT_DIR, output_dir=OUTPUT_DIR, shard_size_mb=args.shard_size_mb)
     extracted_data = extractor.extract_all_pdfs()
     
     if extracted_data:
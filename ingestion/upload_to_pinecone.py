@@ -2,20 +2,48 @@
 Upload embeddings to Pinecone Vector Database
 """
 
+import argparse
+import hashlib
+import itertools
 import json
+import multiprocessing
 import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict
-from pinecone import Pinecone, ServerlessSpec
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import ijson
+import numpy as np
+from pinecone import PineconeApiException, PineconeException, ServerlessSpec
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 from tqdm import tqdm
+from urllib3.exceptions import HTTPError as TransportError
 from dotenv import load_dotenv
 
+# gRPC data plane (protobuf instead of JSON per upsert) when pinecone-client[grpc] is installed
+try:
+    from pinecone.grpc import PineconeGRPC as Pinecone
+    PINECONE_TRANSPORT = "gRPC"
+except ImportError:
+    from pinecone import Pinecone
+    PINECONE_TRANSPORT = "REST"
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
 # Environment variable names
 ENV_PINECONE_API_KEY = "PINECONE_API_KEY"
 ENV_PINECONE_INDEX = "PINECONE_INDEX"
+ENV_PINECONE_INDEX_HOST = "PINECONE_INDEX_HOST"  # Optional: skips host resolution entirely
 
 # Configuration constants
 DEFAULT_INDEX_NAME = "physics-rag"  # Default index name if not set in env
@@ -25,22 +53,75 @@ DEFAULT_EMBEDDING_DIMENSION = 384
 DEFAULT_METRIC = "cosine"
 PINECONE_CLOUD = "aws"
 PINECONE_REGION = "us-east-1"
-DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_SIZE = 1000  # Most vectors per upsert (Pinecone's per-request limit)
+MAX_BATCH_BYTES = 1_800_000  # Estimated payload per upsert, kept under Pinecone's 2 MB request limit
+GRPC_VALUE_BYTES = 4  # Protobuf float
+JSON_VALUE_BYTES = 20  # Upper bound for a float written as JSON text, with separator
+VECTOR_OVERHEAD_BYTES = 64  # Field names, framing and metadata keys per vector
+UPSERT_MAX_ATTEMPTS = 6
+UPSERT_RETRY_INITIAL = 1  # Seconds before the first retry; doubles (with jitter) after that
+UPSERT_RETRY_MAX = 60  # Cap on a single retry delay, including a server-requested Retry-After
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RETRYABLE_GRPC_CODES = {"UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED", "INTERNAL"}  # grpc.StatusCode names
+INDEX_READY_TIMEOUT = 120  # Seconds to wait for freshly upserted vectors to become queryable
+INDEX_READY_POLL_INTERVAL = 2
+INDEX_READY_SAMPLE_SIZE = 10  # Last upserted IDs fetched to confirm the upload is readable
+
+# Bulk import from object storage (cold loads)
+BULK_IMPORT_MIN_VECTORS = 100_000  # Below this, streaming upserts usually finish sooner than an import
+IMPORT_FILE_ROWS = 100_000  # Vectors per Parquet file handed to the import
+IMPORT_NAMESPACE_DIR = "__default__"  # Import layout: <uri>/<namespace>/*.parquet
+IMPORT_POLL_INTERVAL = 30  # Seconds between describe_import calls
+IMPORT_FINAL_STATUSES = {"Completed", "Failed", "Cancelled"}
+PREPARE_GROUP_SIZE = 512  # Chunks whose embeddings are converted to upload lists in one NumPy call
+PIPELINE_QUEUE_SIZE = 4  # Items buffered between pipeline stages before the faster stage waits
+PIPELINE_POLL_INTERVAL = 0.5  # Seconds a blocked stage waits before checking whether the consumer stopped
+VECTOR_DTYPE_FLOAT16 = "float16"
+VECTOR_DTYPE_FLOAT32 = "float32"
+# Precision of the values sent in upsert payloads: half precision only shortens REST's JSON numbers,
+# gRPC sends float32 either way, so rounding there would only lose precision
+DEFAULT_VECTOR_DTYPE = VECTOR_DTYPE_FLOAT16 if PINECONE_TRANSPORT == "REST" else VECTOR_DTYPE_FLOAT32
+DEFAULT_POOL_THREADS = 30  # Upsert requests in flight at once
+MAX_PENDING_PER_THREAD = 2  # Batches queued per pool thread before waiting on the oldest
+WORKER_POOL_THREADS = 8  # Parallel upserts inside each upload worker process
 DEFAULT_TOP_K = 3
-TEXT_METADATA_LIMIT = 1000
-TITLE_METADATA_LIMIT = 200
+TEXT_METADATA_LIMIT = 1000  # UTF-8 bytes (Pinecone's metadata size limit is counted in bytes)
+TITLE_METADATA_LIMIT = 200  # UTF-8 bytes
 
 # File paths
+IMPORT_STAGING_DIR = "pinecone_import"  # Parquet files staged in extracted_data/ before the S3 upload
+UPLOAD_MANIFEST_FILE = ".pinecone_manifest.db"  # Uploaded vector digests per index, in extracted_data/
+MANIFEST_LOOKUP_SIZE = 500  # Vector IDs looked up per manifest query
+MANIFEST_DIGEST_SIZE = 16
+PINECONE_HOST_CACHE_FILE = ".pinecone_host.json"  # Project/index -> data-plane host, in extracted_data/
+HOST_PROBE_ID = "__host_probe__"  # Fetched (and normally absent) to check that a cached host still serves the index
 EXTRACTED_DATA_DIR = "extracted_data"
-CHUNKS_WITH_EMBEDDINGS_FILE = "chunks_with_embeddings.json"
+CHUNKS_FILE = "chunks.parquet"
+EMBEDDINGS_FILE = "embeddings.npy"
+CHUNKS_WITH_EMBEDDINGS_FILE = "chunks_with_embeddings.json"  # Written when pyarrow is not installed
+EMBEDDING_SUMMARY_FILE = "embedding_summary.json"
+PARQUET_READ_BATCH_SIZE = 500  # Chunk rows decoded per Parquet record batch
+PARQUET_CHUNK_COLUMNS = ["text", "arxiv_id", "filename", "title", "chunk_index", "num_pages"]
+SMALL_JSON_FILE_BYTES = 64 * 1024 * 1024  # JSON fallback files up to this size are parsed in one orjson call
+JSON_READ_BUFFER_SIZE = 1 << 20  # 1 MiB reads keep ijson from parsing in tiny increments
+INT8_EMBEDDING_SCALE = 1 / 127  # Must match chunk_and_embed.py
 
 class PineconeUploader:
-    def __init__(self, index_name: str = None):
+    def __init__(
+        self,
+        index_name: str = None,
+        pool_threads: int = DEFAULT_POOL_THREADS,
+        vector_dtype: str = DEFAULT_VECTOR_DTYPE
+    ):
         """
         Initialize Pinecone client and create/connect to index
         
         Args:
             index_name: Name of the Pinecone index (defaults to PINECONE_INDEX env var or DEFAULT_INDEX_NAME)
+            pool_threads: Number of upsert requests the index client sends in parallel
+            vector_dtype: "float16" rounds embedding values to half precision before upload
+                (shorter JSON numbers on the REST transport), "float32" sends them unchanged
+                (default on gRPC, where float16 would save no bytes)
         """            
         # Get API key from environment
         api_key = os.getenv(ENV_PINECONE_API_KEY)
@@ -61,22 +142,96 @@ class PineconeUploader:
                 f"Or it will default to: {DEFAULT_INDEX_NAME}"
             )
         
-        print("Initializing Pinecone...")
-        self.pc = Pinecone(api_key=api_key)
+        # The REST client encodes upsert bodies with the stdlib json module unless orjson is swapped in
+        self.uses_orjson = PINECONE_TRANSPORT == "REST" and use_orjson_for_rest()
+        json_encoder = " + orjson" if self.uses_orjson else ""
+        print(f"Initializing Pinecone ({PINECONE_TRANSPORT}{json_encoder})...")
+        self.api_key = api_key
+        # pool_threads is inherited by every Index created from this client
+        self.pc = Pinecone(api_key=api_key, pool_threads=pool_threads)
         self.index_name = index_name.strip()
+        self.pool_threads = pool_threads
+        self.vector_dtype = np.dtype(vector_dtype)
         self.index = None
+        self.host = None
+        # IDs from the end of the last upload, fetched by wait_until_indexed
+        self.last_upserted_ids = []
+        # Query embedding model, loaded on first test_query and reused afterwards
+        self._embed_model = None
         
+    @property
+    def _host_cache_key(self) -> str:
+        """
+        Host cache key: the project (identified by a digest of its API key, never the key itself)
+        and the index name, so same-named indexes in different projects do not collide
+        """
+        project = hashlib.blake2b(self.api_key.encode('utf-8'), digest_size=8).hexdigest()
+        return f"{project}/{self.index_name}"
+    
+    @staticmethod
+    def _read_host_cache() -> Dict[str, str]:
+        try:
+            with open(Path(EXTRACTED_DATA_DIR) / PINECONE_HOST_CACHE_FILE, 'r', encoding='utf-8') as f:
+                hosts = json.load(f)
+            return hosts if isinstance(hosts, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _load_cached_host(self) -> Optional[str]:
+        """Data-plane host for this index from PINECONE_INDEX_HOST or a previous run"""
+        return os.getenv(ENV_PINECONE_INDEX_HOST) or self._read_host_cache().get(self._host_cache_key)
+    
+    def _save_cached_host(self, host: Optional[str]):
+        """
+        Remember this index's host so later runs can connect without a control-plane lookup
+        host=None drops a stale entry
+        """
+        cache_file = Path(EXTRACTED_DATA_DIR) / PINECONE_HOST_CACHE_FILE
+        hosts = self._read_host_cache()
+        if host is None:
+            hosts.pop(self._host_cache_key, None)
+        else:
+            hosts[self._host_cache_key] = host
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(hosts, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, cache_file)
+    
+    def _connect_cached_host(self, host: str) -> bool:
+        """
+        Connect to a cached host and check it still serves the index with one small fetch
+        (a deleted or recreated index gets a new host; the old one is unreachable or not found)
+        """
+        try:
+            index = self.pc.Index(host=host)
+            index.fetch(ids=[HOST_PROBE_ID])
+        except Exception as e:
+            print(f"⚠ Cached host {host} is not reachable ({type(e).__name__}); looking up the index again")
+            return False
+        self.host = host
+        self.index = index
+        return True
+    
     def create_index(self, dimension: int = DEFAULT_EMBEDDING_DIMENSION, metric: str = DEFAULT_METRIC):
         """
         Create Pinecone index if it doesn't exist
+        If the index host is already known, connect to it directly and skip the control plane
         """
+        host = self._load_cached_host()
+        if host:
+            if self._connect_cached_host(host):
+                print(f"✓ Using cached host for index '{self.index_name}': {host}")
+                return
+            self._save_cached_host(None)
+        
         print(f"Checking if index '{self.index_name}' exists...")
         
-        # Check if index already exists
+        # Check if index already exists (the listing also carries each index's host)
         existing_indexes = self.pc.list_indexes()
-        index_names = [idx.name for idx in existing_indexes]
+        index_hosts = {idx.name: idx.host for idx in existing_indexes}
         
-        if self.index_name not in index_names:
+        if self.index_name not in index_hosts:
             print(f"Creating new index '{self.index_name}'...")
             self.pc.create_index(
                 name=self.index_name,
@@ -88,69 +243,326 @@ class PineconeUploader:
                 )
             )
             print(f"✓ Index '{self.index_name}' created successfully!")
+            host = self.pc.describe_index(self.index_name).host
         else:
             print(f"✓ Index '{self.index_name}' already exists")
+            host = index_hosts[self.index_name]
         
-        # Connect to the index
-        self.index = self.pc.Index(self.index_name)
+        self._save_cached_host(host)
+        self.host = host
         
-        # Get index stats
-        stats = self.index.describe_index_stats()
-        print(f"Index stats: {stats}")
+        # Connect by host, so the client does not resolve it again (its thread pool serves async_req upserts)
+        self.index = self.pc.Index(host=host)
     
-    def prepare_vectors(self, chunks: List[Dict]) -> List[tuple]:
+    def prepare_vectors(self, chunks: Iterable[Dict]) -> Iterator[tuple]:
         """
-        Prepare vectors in Pinecone format
+        Prepare vectors in Pinecone format, lazily in groups of PREPARE_GROUP_SIZE chunks
         Format: (id, embedding, metadata)
+        IDs are <arxiv_id>_chunk_<chunk_index>, the chunk's position within its paper, so a chunk
+        keeps its ID (and its upload manifest entry) when chunking finishes papers in another order
         """
-        vectors = []
+        vector_dtype = self.vector_dtype
+        prefix_arxiv_id = None
+        prefix = ""
         
-        for i, chunk in enumerate(chunks):
-            vector_id = f"{chunk['metadata']['arxiv_id']}_chunk_{i}"
-            embedding = chunk["embedding"]
+        for group in batched(chunks, PREPARE_GROUP_SIZE):
+            # One vectorized cast and one tolist() per group instead of one of each per chunk
+            embeddings = np.asarray([chunk["embedding"] for chunk in group], dtype=vector_dtype).tolist()
             
-            # Prepare metadata (Pinecone has size limits, so be selective)
-            metadata = {
-                "text": chunk["text"][:TEXT_METADATA_LIMIT],  # Limit text size
-                "arxiv_id": chunk["metadata"]["arxiv_id"],
-                "filename": chunk["metadata"]["filename"],
-                "title": chunk["metadata"]["title"][:TITLE_METADATA_LIMIT],  # Limit title size
-                "chunk_index": chunk["metadata"]["chunk_index"],
-                "num_pages": chunk["metadata"]["num_pages"]
-            }
+            for chunk, embedding in zip(group, embeddings):
+                meta = chunk["metadata"]
+                arxiv_id = meta["arxiv_id"]
+                # Chunks arrive grouped by paper, so the ID prefix only changes between papers
+                if arxiv_id != prefix_arxiv_id:
+                    prefix_arxiv_id = arxiv_id
+                    prefix = arxiv_id + "_chunk_"
+                vector_id = prefix + str(meta["chunk_index"])
+                
+                # Prepare metadata (Pinecone has size limits, so be selective)
+                metadata = {
+                    "text": truncate_utf8(chunk["text"], TEXT_METADATA_LIMIT),  # Limit text size
+                    "arxiv_id": arxiv_id,
+                    "filename": meta["filename"],
+                    "title": truncate_utf8(meta["title"], TITLE_METADATA_LIMIT),  # Limit title size
+                    "chunk_index": meta["chunk_index"],
+                    "num_pages": meta["num_pages"]
+                }
+                
+                yield vector_id, embedding, metadata
+    
+    def upload_vectors(
+        self,
+        vectors: Iterable[tuple],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        total: int = None,
+        num_workers: int = 1,
+        manifest: "UploadManifest" = None
+    ) -> int:
+        """
+        Upload vectors to Pinecone in batches
+        Vectors may be a lazy iterator; only the batches in flight are held in memory
+        Batches are sized by estimated payload (MAX_BATCH_BYTES), with batch_size as a cap on vectors
+        Throttled or failed upserts are retried with backoff (upserts are idempotent on ID)
+        total: Number of vectors, if known, for the progress bar
+        num_workers: Upload processes; above 1, request encoding is spread across processes
+        manifest: Skips vectors already uploaded unchanged and records each batch once it succeeds,
+            so reruns and resumed runs only send what is missing
+        Returns: number of vectors uploaded (no index stats are fetched here)
+        """
+        if manifest is not None:
+            vectors = manifest.filter_changed(vectors)
+            if total is not None and not manifest.reupload:
+                total = max(total - manifest.count(), 0)
+        
+        batch_stats = Counter()
+        # Convert, filter and batch on a background thread, so the next batches are ready while
+        # this thread waits on upserts (the queue between them bounds how far ahead it runs)
+        batches = pipeline_stage(
+            sized_batches(vectors, MAX_BATCH_BYTES, batch_size, batch_stats), name="prepare-batches"
+        )
+        
+        if num_workers > 1:
+            print(f"Uploading vectors to Pinecone ({num_workers} processes × {WORKER_POOL_THREADS} parallel requests)...")
+            uploaded, per_worker = self._upload_with_workers(batches, total, num_workers, manifest)
+            for worker, (pid, count) in enumerate(sorted(per_worker.items()), 1):
+                print(f"  Worker {worker} (pid {pid}): {count} vectors")
+        else:
+            print(f"Uploading vectors to Pinecone ({self.pool_threads} parallel requests)...")
+            uploaded = self._upload_in_process(batches, total, manifest)
+        
+        print(f"✓ Successfully uploaded {uploaded} vectors!")
+        if manifest is not None and manifest.skipped:
+            print(f"  Skipped {manifest.skipped} vectors already uploaded unchanged")
+        if batch_stats["batches"]:
+            print(
+                f"  {batch_stats['batches']} batches, "
+                f"avg {batch_stats['vectors'] / batch_stats['batches']:.0f} vectors "
+                f"(~{batch_stats['bytes'] / batch_stats['batches'] / 1024:.0f} KB) per batch"
+            )
+        
+        return uploaded
+    
+    def print_stats(self):
+        """Print index stats (one describe_index_stats round-trip)"""
+        print(f"Index stats: {self.index.describe_index_stats()}")
+    
+    def wait_until_indexed(self, sample_ids: List[str], timeout: float = INDEX_READY_TIMEOUT):
+        """
+        Wait until a sample of the last upserted IDs can be fetched, then print the final stats once
+        Serverless indexes already defer index building: upserts are acknowledged once written to the
+        write log and become readable shortly after, so queries right after a bulk load can miss vectors
+        Fetching IDs from the end of the upload checks this run's writes directly; vector counts are
+        themselves eventually consistent and do not change on overwrites
+        """
+        if sample_ids:
+            deadline = time.monotonic() + timeout
+            found = len(self.index.fetch(ids=sample_ids).vectors)
+            while found < len(sample_ids) and time.monotonic() < deadline:
+                time.sleep(INDEX_READY_POLL_INTERVAL)
+                found = len(self.index.fetch(ids=sample_ids).vectors)
             
-            vectors.append((vector_id, embedding, metadata))
+            if found < len(sample_ids):
+                print(f"⚠ Only {found}/{len(sample_ids)} of the last upserted vectors readable after {timeout}s; "
+                      f"still indexing")
+        self.print_stats()
+    
+    def _upload_in_process(
+        self,
+        batches: Iterable[List[tuple]],
+        total: Optional[int],
+        manifest: "UploadManifest" = None
+    ) -> int:
+        """
+        Upload from this process: batches are sent with async_req so several upserts are in flight at once;
+        a batch that fails with a retryable error is re-sent with backoff, anything else is raised
+        """
+        max_pending = self.pool_threads * MAX_PENDING_PER_THREAD
+        pending = deque()
+        uploaded = 0
         
-        return vectors
+        def collect():
+            result, batch = pending.popleft()
+            wait_for_upsert_or_retry(self.index, result, batch)
+            progress.update(len(batch))
+            self.last_upserted_ids = [vector[0] for vector in batch[-INDEX_READY_SAMPLE_SIZE:]]
+            if manifest is not None:
+                manifest.record(batch)
+        
+        with tqdm(total=total, unit="vec") as progress:
+            for batch in batches:
+                pending.append((self.index.upsert(vectors=batch, async_req=True), batch))
+                uploaded += len(batch)
+                
+                # Bound the queue so batches are not all held waiting for a free thread
+                if len(pending) >= max_pending:
+                    collect()
+            
+            while pending:
+                collect()
+        
+        return uploaded
     
-    def upload_vectors(self, vectors: List[tuple], batch_size: int = DEFAULT_BATCH_SIZE):
+    def _upload_with_workers(
+        self,
+        batches: Iterable[List[tuple]],
+        total: Optional[int],
+        num_workers: int,
+        manifest: "UploadManifest" = None
+    ) -> Tuple[int, Counter]:
         """
-        Upload vectors to Pinecone in batches
+        Upload through a pool of worker processes, each with its own Pinecone client
+        Each task is a group of WORKER_POOL_THREADS batches that the worker upserts in parallel,
+        so protobuf/JSON encoding runs outside this process's GIL
+        Returns: (vectors uploaded, vectors per worker pid)
         """
-        print(f"Uploading {len(vectors)} vectors to Pinecone...")
+        # Clients (and gRPC channels) cannot be forked, so workers start fresh and build their own
+        executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_upload_worker,
+            initargs=(self.api_key, self.host, WORKER_POOL_THREADS)
+        )
+        max_pending = num_workers * MAX_PENDING_PER_THREAD
+        pending = deque()
+        per_worker = Counter()
         
-        # Upload in batches
-        for i in tqdm(range(0, len(vectors), batch_size)):
-            batch = vectors[i:i + batch_size]
-            self.index.upsert(vectors=batch)
+        def collect():
+            future, task = pending.popleft()
+            pid, count = future.result()
+            per_worker[pid] += count
+            progress.update(count)
+            self.last_upserted_ids = [vector[0] for vector in task[-1][-INDEX_READY_SAMPLE_SIZE:]]
+            if manifest is not None:
+                for batch in task:
+                    manifest.record(batch)
+        
+        with executor, tqdm(total=total, unit="vec") as progress:
+            for task in batched(batches, WORKER_POOL_THREADS):
+                pending.append((executor.submit(_upsert_batches_in_worker, task), task))
+                
+                if len(pending) >= max_pending:
+                    collect()
+            
+            while pending:
+                collect()
+        
+        return sum(per_worker.values()), per_worker
+    
+    @staticmethod
+    def write_import_files(vectors: Iterable[tuple], output_dir: Path) -> List[Path]:
+        """
+        Write vectors in Pinecone's import format: Parquet files with id, values and metadata (JSON string)
+        Returns: paths of the files written
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
         
-        print(f"✓ Successfully uploaded {len(vectors)} vectors!")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for old_file in output_dir.glob("*.parquet"):
+            old_file.unlink()
         
-        # Get final stats
-        stats = self.index.describe_index_stats()
-        print(f"Final index stats: {stats}")
+        schema = pa.schema([
+            ("id", pa.string()),
+            ("values", pa.list_(pa.float32())),
+            ("metadata", pa.string())
+        ])
+        paths = []
+        for part, batch in enumerate(batched(vectors, IMPORT_FILE_ROWS)):
+            ids, values, metadata = zip(*batch)
+            table = pa.table({
+                "id": list(ids),
+                "values": list(values),
+                "metadata": [json.dumps(meta, ensure_ascii=False) for meta in metadata]
+            }, schema=schema)
+            path = output_dir / f"part-{part:05d}.parquet"
+            pq.write_table(table, path)
+            paths.append(path)
+        return paths
+    
+    def bulk_import_from_s3(
+        self,
+        vectors: Iterable[tuple],
+        s3_uri: str,
+        integration_id: str = None,
+        staging_dir: str = EXTRACTED_DATA_DIR
+    ) -> int:
+        """
+        Load vectors with Pinecone's import-from-object-storage instead of upserts (serverless indexes)
+        Vectors are written as Parquet, uploaded to s3_uri with boto3, then imported server-side
+        integration_id: Pinecone storage integration for private buckets
+        Returns: number of records imported
+        """
+        if not s3_uri.startswith("s3://"):
+            raise ValueError(f"Expected an s3:// URI, got: {s3_uri}")
+        bucket, _, prefix = s3_uri[len("s3://"):].partition("/")
+        prefix = prefix.rstrip("/") + "/" if prefix else ""
+        s3_uri = f"s3://{bucket}/{prefix}"
+        
+        # Imports are a REST-only feature of newer clients (pinecone >= 5); check before staging any files
+        from pinecone import Pinecone as PineconeREST
+        import_index = PineconeREST(api_key=self.api_key).Index(host=self.host)
+        if not hasattr(import_index, "start_import"):
+            raise RuntimeError(
+                "Bulk import needs a Pinecone client with Index.start_import (pinecone>=5); "
+                "the installed client only supports upserts"
+            )
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("Bulk import needs boto3 to upload files to S3 (pip install boto3)")
+        
+        local_dir = Path(staging_dir) / IMPORT_STAGING_DIR / IMPORT_NAMESPACE_DIR
+        print(f"Writing import files to {local_dir}...")
+        last_ids = deque(maxlen=INDEX_READY_SAMPLE_SIZE)
+        
+        def remember_last_ids():
+            for vector in vectors:
+                last_ids.append(vector[0])
+                yield vector
+        
+        paths = self.write_import_files(remember_last_ids(), local_dir)
+        
+        s3 = boto3.client("s3")
+        for path in tqdm(paths, desc="Uploading to S3"):
+            s3.upload_file(str(path), bucket, f"{prefix}{IMPORT_NAMESPACE_DIR}/{path.name}")
+        
+        import_kwargs = {"uri": s3_uri}
+        if integration_id:
+            import_kwargs["integration_id"] = integration_id
+        import_id = import_index.start_import(**import_kwargs).id
+        print(f"✓ Started import {import_id} from {s3_uri}")
+        
+        while True:
+            status = import_index.describe_import(id=import_id)
+            if status.status in IMPORT_FINAL_STATUSES:
+                break
+            print(f"  Import {status.status}: {status.percent_complete or 0:.0f}% complete")
+            time.sleep(IMPORT_POLL_INTERVAL)
+        
+        if status.status != "Completed":
+            raise RuntimeError(f"Import {import_id} {status.status.lower()}: {status.error}")
+        
+        print(f"✓ Imported {status.records_imported} vectors")
+        self.last_upserted_ids = list(last_ids)
+        return status.records_imported
     
     def test_query(self, query_text: str = "What is the AdS/CFT correspondence?"):
         """
         Test query to verify the index is working
+        Run after upload_vectors, which waits for the uploaded vectors to become queryable
         """
-        from sentence_transformers import SentenceTransformer
-        
         print(f"\nTesting query: '{query_text}'")
         
-        # Generate embedding for query
-        model = SentenceTransformer(EMBEDDING_MODEL_NAME)
-        query_embedding = model.encode(query_text).tolist()
+        # Load the model once per uploader (imported lazily so upload worker processes never load torch)
+        if self._embed_model is None:
+            from sentence_transformers import SentenceTransformer
+            self._embed_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        
+        # Generate embedding for query (normalized like the stored chunk embeddings)
+        query_embedding = self._embed_model.encode(
+            query_text, convert_to_numpy=True, normalize_embeddings=True
+        )
+        query_embedding = query_embedding.astype(np.float32).tolist()
         
         # Query Pinecone
         results = self.index.query(
@@ -167,28 +579,439 @@ class PineconeUploader:
             print(f"   Text preview: {match['metadata']['text'][:200]}...")
 
 
+# Index client of an upload worker process, created by _init_upload_worker
+_worker_index = None
+
+
+def _init_upload_worker(api_key: str, host: str, pool_threads: int):
+    """Process pool initializer: connect this worker to the index by host"""
+    global _worker_index
+    # Spawned workers start with an unpatched REST client
+    if PINECONE_TRANSPORT == "REST":
+        use_orjson_for_rest()
+    _worker_index = Pinecone(api_key=api_key, pool_threads=pool_threads).Index(host=host)
+
+
+def _upsert_batches_in_worker(batches: List[List[tuple]]) -> Tuple[int, int]:
+    """
+    Upsert a group of batches in parallel from a worker process
+    Returns: (worker pid, vectors uploaded)
+    """
+    results = [_worker_index.upsert(vectors=batch, async_req=True) for batch in batches]
+    for result, batch in zip(results, batches):
+        wait_for_upsert_or_retry(_worker_index, result, batch)
+    return os.getpid(), sum(len(batch) for batch in batches)
+
+
+class _OrjsonCodec:
+    """Stand-in for the json module inside the REST client: request bodies are encoded with orjson"""
+    dumps = staticmethod(lambda obj, **kwargs: orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY))
+    loads = staticmethod(orjson.loads) if orjson is not None else staticmethod(json.loads)
+
+
+def use_orjson_for_rest() -> bool:
+    """
+    Encode REST upsert bodies with orjson instead of the stdlib json module
+    No-op (returns False) on the gRPC transport or when orjson is not installed
+    """
+    if orjson is None or PINECONE_TRANSPORT != "REST":
+        return False
+    try:
+        from pinecone.core.client import rest
+    except ImportError:
+        return False
+    # The REST client calls json.dumps(body) on the already-sanitized request body; urllib3 takes the bytes as-is
+    rest.json = _OrjsonCodec
+    return True
+
+
+def wait_for_upsert(result):
+    """Block on an async_req upsert: gRPC returns a future (.result()), REST an AsyncResult (.get())"""
+    if hasattr(result, "result"):
+        return result.result()
+    return result.get()
+
+
+def is_retryable_upsert_error(error: BaseException) -> bool:
+    """Throttling, server errors and dropped connections are worth retrying; bad requests are not"""
+    if isinstance(error, PineconeApiException):
+        return error.status in RETRYABLE_STATUSES
+    # REST connection drops and timeouts surface as urllib3 errors (ProtocolError, ReadTimeoutError, ...)
+    if isinstance(error, (TransportError, ConnectionError, TimeoutError)):
+        return True
+    # gRPC: a raw grpc.RpcError (blocking upsert) or a PineconeException raised from one (async futures)
+    return grpc_status_name(error) in RETRYABLE_GRPC_CODES
+
+
+def grpc_status_name(error: BaseException) -> Optional[str]:
+    """
+    Name of the gRPC status code (e.g. "UNAVAILABLE") of a grpc.RpcError, or of the one a
+    PineconeException was raised from; None for anything else (grpc itself is an optional extra)
+    """
+    for candidate in (error, error.__cause__):
+        code = getattr(candidate, "code", None)
+        if callable(code):
+            try:
+                return code().name
+            except Exception:
+                return None
+    return None
+
+
+_upsert_backoff = wait_exponential_jitter(initial=UPSERT_RETRY_INITIAL, max=UPSERT_RETRY_MAX)
+
+
+def wait_retry_after_or_backoff(retry_state) -> float:
+    """Honor a 429's Retry-After header, otherwise exponential backoff with jitter"""
+    error = retry_state.outcome.exception()
+    headers = getattr(error, "headers", None) or {}
+    retry_after = headers.get("Retry-After") or headers.get("retry-after")
+    if retry_after:
+        try:
+            return min(float(retry_after), UPSERT_RETRY_MAX)
+        except ValueError:
+            pass
+    return _upsert_backoff(retry_state)
+
+
+@retry(
+    retry=retry_if_exception(is_retryable_upsert_error),
+    wait=wait_retry_after_or_backoff,
+    stop=stop_after_attempt(UPSERT_MAX_ATTEMPTS),
+    reraise=True
+)
+def upsert_with_retry(index, batch: List[tuple]):
+    """Blocking upsert of one batch, retried with backoff"""
+    return index.upsert(vectors=batch)
+
+
+def wait_for_upsert_or_retry(index, result, batch: List[tuple]):
+    """Wait on an async upsert; if it failed with a retryable error, re-send the batch with backoff"""
+    try:
+        return wait_for_upsert(result)
+    except Exception as e:
+        if not is_retryable_upsert_error(e):
+            raise
+        tqdm.write(f"⚠ Upsert of {len(batch)} vectors failed ({type(e).__name__}), retrying...")
+        return upsert_with_retry(index, batch)
+
+
+class UploadManifest:
+    """
+    SQLite record of what each index already holds: vector ID -> digest of its values and metadata
+    Rows are written only after the batch's upsert succeeded, so a crashed run re-sends at most
+    the batches that were in flight; reruns over unchanged data send nothing
+    """
+    
+    def __init__(self, path: Path, index_name: str, reupload: bool = False):
+        """
+        reupload: Send every vector, even ones recorded unchanged (rows are replaced as batches succeed)
+        """
+        self.path = Path(path)
+        self.index_name = index_name
+        self.reupload = reupload
+        # Lookups run on the batching thread and inserts on the upload thread, serialized by the lock
+        self.connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            "index_name TEXT NOT NULL, id TEXT NOT NULL, hash BLOB NOT NULL, "
+            "PRIMARY KEY (index_name, id))"
+        )
+        self.connection.commit()
+        # Digests of vectors sent but not yet confirmed, recorded once their batch succeeds
+        self._pending = {}
+        self.skipped = 0
+    
+    def count(self) -> int:
+        """Vectors recorded for this index"""
+        row = self.connection.execute(
+            "SELECT COUNT(*) FROM vectors WHERE index_name = ?", (self.index_name,)
+        ).fetchone()
+        return row[0]
+    
+    @staticmethod
+    def _digests(group: List[tuple]) -> List[bytes]:
+        """blake2b digest of each vector's float32 values and its metadata"""
+        values = np.asarray([vector[1] for vector in group], dtype=np.float32)
+        digests = []
+        for row, (_, _, metadata) in zip(values, group):
+            digest = hashlib.blake2b(row.tobytes(), digest_size=MANIFEST_DIGEST_SIZE)
+            digest.update(json.dumps(metadata, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+            digests.append(digest.digest())
+        return digests
+    
+    def filter_changed(self, vectors: Iterable[tuple]) -> Iterator[tuple]:
+        """Yield only vectors that are new or changed since they were last uploaded to this index"""
+        for group in batched(vectors, MANIFEST_LOOKUP_SIZE):
+            digests = self._digests(group)
+            placeholders = ",".join("?" * len(group))
+            with self._lock:
+                known = dict(self.connection.execute(
+                    f"SELECT id, hash FROM vectors WHERE index_name = ? AND id IN ({placeholders})",
+                    (self.index_name, *(vector[0] for vector in group))
+                ))
+            for vector, digest in zip(group, digests):
+                if known.get(vector[0]) == digest and not self.reupload:
+                    self.skipped += 1
+                    continue
+                self._pending[vector[0]] = digest
+                yield vector
+    
+    def record(self, batch: List[tuple]):
+        """Mark a successfully upserted batch as uploaded (one transaction per batch)"""
+        rows = [(self.index_name, vector[0], self._pending.pop(vector[0])) for vector in batch]
+        with self._lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO vectors VALUES (?, ?, ?)", rows)
+    
+    def close(self):
+        self.connection.close()
+
+
+def truncate_utf8(text: str, max_bytes: int) -> str:
+    """Cut text to at most max_bytes of UTF-8 without splitting a character"""
+    # A character is at least one byte, so only the first max_bytes characters can survive
+    head = text[:max_bytes]
+    encoded = head.encode('utf-8')
+    if len(encoded) <= max_bytes:
+        return head
+    return encoded[:max_bytes].decode('utf-8', 'ignore')
+
+
+def estimate_vector_bytes(vector: tuple, value_bytes: int) -> int:
+    """Rough upsert payload size of one (id, values, metadata) vector"""
+    vector_id, values, metadata = vector
+    metadata_bytes = sum(len(key) + len(str(value)) for key, value in metadata.items())
+    return len(vector_id) + len(values) * value_bytes + metadata_bytes + VECTOR_OVERHEAD_BYTES
+
+
+def sized_batches(
+    vectors: Iterable[tuple],
+    max_bytes: int,
+    max_count: int,
+    stats: Counter = None
+) -> Iterator[List[tuple]]:
+    """
+    Group vectors into batches that stay under max_bytes of estimated payload and max_count vectors
+    stats: Optional Counter that receives batches / vectors / bytes totals
+    """
+    value_bytes = GRPC_VALUE_BYTES if PINECONE_TRANSPORT == "gRPC" else JSON_VALUE_BYTES
+    batch = []
+    batch_bytes = 0
+    
+    for vector in vectors:
+        vector_bytes = estimate_vector_bytes(vector, value_bytes)
+        if batch and (batch_bytes + vector_bytes > max_bytes or len(batch) >= max_count):
+            if stats is not None:
+                stats.update(batches=1, vectors=len(batch), bytes=batch_bytes)
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(vector)
+        batch_bytes += vector_bytes
+    
+    if batch:
+        if stats is not None:
+            stats.update(batches=1, vectors=len(batch), bytes=batch_bytes)
+        yield batch
+
+
+def batched(items: Iterable, batch_size: int) -> Iterator[List]:
+    """Yield successive lists of up to batch_size items without slicing copies of the whole input"""
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def pipeline_stage(items: Iterable, maxsize: int = PIPELINE_QUEUE_SIZE, name: str = None) -> Iterator:
+    """
+    Iterate items on a background thread and yield them here through a bounded queue
+    Disk reads, NumPy conversion and network waits release the GIL, so chained stages overlap;
+    a full queue blocks the producing thread (backpressure), and its exceptions are re-raised here
+    """
+    buffer = queue.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+    done = object()
+    
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=PIPELINE_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as error:
+            put((done, error))
+    
+    threading.Thread(target=produce, name=name, daemon=True).start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        # Unblock the producer if the consumer stops early (error or interrupted upload)
+        stopped.set()
+
+
+def load_chunks_with_embeddings(data_dir: str = EXTRACTED_DATA_DIR) -> Optional[Iterable[Dict]]:
+    """
+    Load chunks written by chunk_and_embed.py
+    Reads the Parquet + .npy output, or the JSON fallback (streamed one chunk at a time when large)
+    """
+    data_dir = Path(data_dir)
+    chunks_file = data_dir / CHUNKS_FILE
+    embeddings_file = data_dir / EMBEDDINGS_FILE
+    
+    if chunks_file.exists() and embeddings_file.exists():
+        print(f"Streaming chunks from {chunks_file}...")
+        return iter_parquet_chunks(chunks_file, embeddings_file)
+    
+    json_file = data_dir / CHUNKS_WITH_EMBEDDINGS_FILE
+    if json_file.exists():
+        # Small files parse fastest in one orjson call; large ones are streamed to bound memory
+        if orjson is not None and json_file.stat().st_size <= SMALL_JSON_FILE_BYTES:
+            print(f"Loading chunks from {json_file}...")
+            with open(json_file, 'rb') as f:
+                return orjson.loads(f.read())
+        print(f"Streaming chunks from {json_file}...")
+        return iter_json_chunks(json_file)
+    
+    return None
+
+
+def dequantize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Undo int8 scaling; float16/float32 storage is returned as-is (no copy),
+    since prepare_vectors casts each row to the upload dtype anyway
+    """
+    if embeddings.dtype == np.int8:
+        return embeddings.astype(np.float32) * np.float32(INT8_EMBEDDING_SCALE)
+    return embeddings
+
+
+def iter_parquet_chunks(chunks_file: Path, embeddings_file: Path) -> Iterator[Dict]:
+    """
+    Yield chunks from the Parquet table one record batch at a time
+    Embeddings stay memory-mapped; rows are read straight from the mapping as each chunk is consumed
+    """
+    import pyarrow.parquet as pq
+    
+    embeddings = np.load(embeddings_file, mmap_mode='r')
+    parquet_file = pq.ParquetFile(chunks_file)
+    
+    start = 0
+    for batch in parquet_file.iter_batches(batch_size=PARQUET_READ_BATCH_SIZE, columns=PARQUET_CHUNK_COLUMNS):
+        stop = start + batch.num_rows
+        batch_embeddings = dequantize_embeddings(embeddings[start:stop])
+        
+        columns = batch.to_pydict()
+        texts = columns.pop("text")
+        names = list(columns)
+        for text, embedding, values in zip(texts, batch_embeddings, zip(*columns.values())):
+            yield {"text": text, "metadata": dict(zip(names, values)), "embedding": embedding}
+        start = stop
+
+
+def iter_json_chunks(json_file: Path) -> Iterator[Dict]:
+    """Yield chunks from the JSON fallback array without loading the whole file"""
+    with open(json_file, 'rb', buffering=JSON_READ_BUFFER_SIZE) as f:
+        yield from ijson.items(f, 'item', use_float=True)
+
+
+def load_total_chunks(data_dir: str = EXTRACTED_DATA_DIR) -> Optional[int]:
+    """Chunk count recorded in chunk_and_embed.py's summary (None if unavailable)"""
+    try:
+        with open(Path(data_dir) / EMBEDDING_SUMMARY_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get("total_chunks")
+    except (OSError, ValueError):
+        return None
+
+
 def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(
+        description='Upload chunk embeddings from extracted_data/ to Pinecone'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Ignore the upload manifest and upload every vector again'
+    )
+    parser.add_argument(
+        '--s3-uri',
+        type=str,
+        default=None,
+        help='Cold load: stage vectors as Parquet under this s3:// prefix and bulk-import them instead of upserting'
+    )
+    parser.add_argument(
+        '--s3-integration-id',
+        type=str,
+        default=None,
+        help='Pinecone storage integration ID for a private S3 bucket (used with --s3-uri)'
+    )
+    parser.add_argument(
+        '--no-test-query',
+        action='store_true',
+        help='Skip the test query and the wait for vectors to become queryable (e.g. in CI)'
+    )
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help='Print index stats once at the end (implied unless --no-test-query)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Upload processes, each with its own Pinecone client (default: 1, uploads in-process)'
+    )
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("Pinecone Upload Pipeline")
     print("=" * 80)
     print()
     
     # Load chunks with embeddings
-    chunks_file = Path(EXTRACTED_DATA_DIR) / CHUNKS_WITH_EMBEDDINGS_FILE
+    chunks = load_chunks_with_embeddings(EXTRACTED_DATA_DIR)
     
-    if not chunks_file.exists():
-        print(f"Error: {chunks_file} not found!")
+    if chunks is None:
+        print(f"Error: no chunk data found in {EXTRACTED_DATA_DIR}!")
         print("Please run chunk_and_embed.py first.")
         return
     
-    print(f"Loading chunks from {chunks_file}...")
-    with open(chunks_file, 'r', encoding='utf-8') as f:
-        chunks = json.load(f)
+    # Peek at the first chunk for the embedding dimension, then put it back in the stream
+    chunks = iter(chunks)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        print(f"Error: no chunks in {EXTRACTED_DATA_DIR}!")
+        return
+    # Read (and parse) chunks on their own thread, a group at a time, ahead of conversion and upload
+    chunks = itertools.chain.from_iterable(pipeline_stage(
+        batched(itertools.chain([first_chunk], chunks), PREPARE_GROUP_SIZE), name="read-chunks"
+    ))
     
-    print(f"Loaded {len(chunks)} chunks")
+    total_chunks = load_total_chunks(EXTRACTED_DATA_DIR)
+    if total_chunks is not None:
+        print(f"Found {total_chunks} chunks")
     
     # Get embedding dimension
-    embedding_dim = len(chunks[0]["embedding"])
+    embedding_dim = len(first_chunk["embedding"])
     print(f"Embedding dimension: {embedding_dim}")
     
     print()
@@ -209,18 +1032,45 @@ def main():
     
     print()
     
-    # Prepare vectors
-    vectors = uploader.prepare_vectors(chunks)
-    
-    print()
-    
-    # Upload to Pinecone
-    uploader.upload_vectors(vectors)
-    
-    print()
+    if args.s3_uri:
+        # Cold load: the import reads Parquet server-side, so there is no client-side upsert loop
+        if total_chunks is not None and total_chunks < BULK_IMPORT_MIN_VECTORS:
+            print(f"⚠ Only {total_chunks} vectors; streaming upserts (without --s3-uri) are usually faster below "
+                  f"{BULK_IMPORT_MIN_VECTORS}")
+        uploader.bulk_import_from_s3(
+            uploader.prepare_vectors(chunks), args.s3_uri, integration_id=args.s3_integration_id
+        )
+    else:
+        # Skip vectors a previous run already uploaded unchanged (also resumes an interrupted run)
+        manifest = UploadManifest(
+            Path(EXTRACTED_DATA_DIR) / UPLOAD_MANIFEST_FILE, uploader.index_name, reupload=args.force
+        )
+        recorded = manifest.count()
+        if recorded and not args.force:
+            print(f"↻ {recorded} vectors already uploaded to '{uploader.index_name}'; "
+                  f"only new or changed chunks are sent (--force to redo)")
+        
+        # Prepare vectors lazily, so chunks are read, converted and uploaded batch by batch
+        vectors = uploader.prepare_vectors(chunks)
+        
+        # Upload to Pinecone
+        try:
+            uploader.upload_vectors(vectors, total=total_chunks, num_workers=args.workers, manifest=manifest)
+        finally:
+            manifest.close()
     
-    # Test query
-    uploader.test_query("What is the AdS/CFT correspondence?")
+    # Index stats are a slow round-trip on serverless, so they are only fetched once, at the end
+    if args.no_test_query:
+        if args.stats:
+            uploader.print_stats()
+    else:
+        # Wait for the last upserted vectors to become readable (prints the final stats), then test
+        uploader.wait_until_indexed(uploader.last_upserted_ids)
+        
+        print()
+        
+        # Test query
+        uploader.test_query("What is the AdS/CFT correspondence?")
     
     print()
     print("=" * 80)